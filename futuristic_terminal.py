@@ -1,39 +1,64 @@
+import time
+# Startup phases are measured from here (see --profile-startup)
+STARTUP_STARTED = time.perf_counter()
 import os
 import sys
 import subprocess
 import platform
-import time
+import importlib.util
+import argparse
+import atexit
+import bisect
+import collections
+import copy
 import glob
+import hashlib
+import itertools
 import shlex
+import shutil
+import tempfile
+import queue
+import selectors
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from prompt_toolkit import PromptSession
+from prompt_toolkit.application.current import get_app_or_none
 from prompt_toolkit.styles import Style
-from prompt_toolkit.formatted_text import HTML
 from prompt_toolkit.history import FileHistory
-from prompt_toolkit.completion import Completer, Completion, WordCompleter
+from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.completion.base import CompleteEvent
 from prompt_toolkit.document import Document
 from prompt_toolkit.formatted_text import FormattedText
-from prompt_toolkit.completion.filesystem import PathCompleter
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
-from rich.syntax import Syntax
 import colorama
 from datetime import datetime
 from typing import Dict, Set, List, Tuple, Optional
 import json
-from PIL import Image
-import io
-import base64
-from rich.layout import Layout
-from rich.columns import Columns
+import re
+
+# pyfiglet is used for font rendering; it is only imported when fonts are needed
+# (Pillow likewise only loads when a banner image is configured)
+PYFIGLET_AVAILABLE = importlib.util.find_spec('pyfiglet') is not None
+
+# Pseudo-terminal support for interactive programs (not available on Windows)
+try:
+    import pty
+    import tty
+    import termios
+    import fcntl
+    import signal
+    PTY_AVAILABLE = True
+except ImportError:
+    PTY_AVAILABLE = False
 
-# Import pyfiglet for font rendering
+# Resource usage of child processes (not available on Windows)
 try:
-    import pyfiglet
-    PYFIGLET_AVAILABLE = True
+    import resource
+    RESOURCE_AVAILABLE = True
 except ImportError:
-    PYFIGLET_AVAILABLE = False
+    RESOURCE_AVAILABLE = False
 
 # Initialize colorama for Windows
 if platform.system() == 'Windows':
@@ -64,9 +89,753 @@ style = Style.from_dict({
     'black': '#000000'
 })
 
+def read_umask() -> int:
+    """Return the process umask (it can only be read by setting it, so this runs once at import)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# The mode open() gives a new file; mkstemp creates its temp files as 0600
+NEW_FILE_MODE = 0o666 & ~read_umask()
+
+def set_replacement_mode(temp_file: str, path: str):
+    """Give a temp file the mode of the file it will replace, or that of a newly created file"""
+    if os.path.exists(path):
+        shutil.copymode(path, temp_file)
+    else:
+        os.chmod(temp_file, NEW_FILE_MODE)
+
+def write_json_atomic(path: str, data, indent: Optional[int] = None, durable: bool = True, backup: bool = False):
+    """Write JSON to a temp file and swap it in (optionally fsynced, keeping the old file as .bak)"""
+    directory = os.path.dirname(path) or '.'
+    fd, temp_file = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        set_replacement_mode(temp_file, path)
+        if backup and os.path.exists(path):
+            # The file being replaced was written by us, so it is the last good version
+            backup_file = path + '.bak'
+            try:
+                os.link(path, temp_file + '.bak')
+                os.replace(temp_file + '.bak', backup_file)
+            except OSError:
+                shutil.copy2(path, backup_file)
+        os.replace(temp_file, path)
+    except BaseException:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+    if durable and hasattr(os, 'O_DIRECTORY'):
+        # Make the rename itself durable
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+class CommandIndex:
+    """Index of executables found in PATH, persisted to disk and invalidated per directory"""
+    def __init__(self, index_file: Optional[str] = None, refresh_interval: float = 2.0):
+        self.index_file = index_file or os.path.join(os.path.expanduser('~'), '.terminal_command_index.json')
+        # Minimum number of seconds between two PATH freshness checks
+        self.refresh_interval = refresh_interval
+        # directory -> {'mtime': float, 'commands': [names]}
+        self._directories: Dict[str, dict] = {}
+        self._commands: Optional[Set[str]] = None
+        # command -> PATH directory that provides it
+        self._locations: Dict[str, str] = {}
+        # command -> resolved executable path, for lookups the index alone can't answer (Windows)
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._path_value = None
+        self._last_refresh = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Load the persisted index from disk"""
+        self._loaded = True
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            if data.get('system') == platform.system():
+                self._directories = data.get('directories', {})
+        except Exception:
+            self._directories = {}
+
+    def _save(self):
+        """Persist the index to disk (written to a temp file, then swapped in)"""
+        try:
+            write_json_atomic(self.index_file, {'system': platform.system(), 'directories': self._directories},
+                              durable=False)
+        except Exception:
+            pass
+
+    def _scan_directory(self, directory: str) -> List[str]:
+        """List the executable commands in a single PATH directory"""
+        commands = []
+        if platform.system() == 'Windows':
+            # Windows executable extensions
+            extensions = ('.exe', '.bat', '.cmd', '.ps1', '.com', '.vbs')
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    name = entry.name.lower()
+                    if platform.system() == 'Windows':
+                        # Windows: check for executable extensions and strip them
+                        if name.endswith(extensions):
+                            commands.append(os.path.splitext(name)[0])
+                    elif os.access(entry.path, os.X_OK):
+                        # Unix-like: check if file has execute permission
+                        commands.append(name)
+                except OSError:
+                    continue
+        return commands
+
+    def refresh(self, force: bool = False):
+        """Rescan the PATH directories whose mtime changed since they were indexed"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            path_value = os.environ.get('PATH', '')
+            now = time.monotonic()
+            if (not force and path_value == self._path_value
+                    and now - self._last_refresh < self.refresh_interval):
+                return
+
+            separator = ';' if platform.system() == 'Windows' else ':'
+            directories = []
+            for directory in path_value.split(separator):
+                if directory and directory not in directories:
+                    directories.append(directory)
+
+            changed = False
+            index = {}
+            for directory in directories:
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    # Skip directories that don't exist or we can't access
+                    continue
+
+                cached = self._directories.get(directory)
+                if cached is not None and cached.get('mtime') == mtime:
+                    index[directory] = cached
+                    continue
+
+                try:
+                    index[directory] = {'mtime': mtime, 'commands': self._scan_directory(directory)}
+                except OSError:
+                    continue
+                changed = True
+
+            if changed or set(index) != set(self._directories):
+                self._directories = index
+                self._save()
+                self._commands = None
+            if self._commands is None or path_value != self._path_value:
+                # The first PATH directory providing a command wins, like the shell's lookup
+                locations = {}
+                for directory, entry in index.items():
+                    for cmd in entry['commands']:
+                        locations.setdefault(cmd, directory)
+                self._locations = locations
+                self._resolved = {}
+                self._commands = set(locations)
+            self._path_value = path_value
+            self._last_refresh = now
+
+    def commands(self) -> Set[str]:
+        """Return every indexed command name, refreshing stale directories first"""
+        self.refresh()
+        return self._commands
+
+    def is_indexed(self, command: str) -> bool:
+        """Whether a bare command name was found in a PATH directory"""
+        return command.lower() in self._locations
+
+    def resolve(self, command: str) -> Optional[str]:
+        """Return the path of the executable a command name runs, from the index alone"""
+        directory = self._locations.get(command.lower())
+        if directory is None:
+            return shutil.which(command)
+        if platform.system() == 'Windows':
+            # Windows names are indexed without their extension; let shutil find the real file, once per index
+            resolved = self._resolved
+            if command not in resolved:
+                resolved[command] = shutil.which(command)
+            return resolved[command]
+        return os.path.join(directory, command)
+
+# Shared PATH command index, built lazily on first completion
+command_index = CommandIndex()
+
+def format_size(total_size: int) -> str:
+    """Format a byte count for display"""
+    if total_size < 1024:
+        return f"{total_size} B"
+    elif total_size < 1024 * 1024:
+        return f"{total_size/1024:.1f} KB"
+    else:
+        return f"{total_size/(1024*1024):.1f} MB"
+
+class DirectoryStatsCache:
+    """Directory size and item counts computed by background workers, cached by path and mtime"""
+    def __init__(self, max_workers: int = 2, time_budget: float = 2.0, max_files: int = 50000,
+                 max_entries: int = 4096):
+        # Per-directory budget: stop walking after this many seconds or files and mark the result partial
+        self.time_budget = time_budget
+        self.max_files = max_files
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        # path -> (mtime, {'items': int, 'size': int, 'truncated': bool})
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+        self._pending: Set[Tuple[str, float]] = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self, path: str, mtime: float) -> Optional[dict]:
+        """Return cached stats for a directory, or schedule them and return None"""
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            key = (path, mtime)
+            if key not in self._pending:
+                self._pending.add(key)
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='dir-stats')
+                self._executor.submit(self._compute, path, mtime)
+        return None
+
+    def _compute(self, path: str, mtime: float):
+        """Walk a directory tree within the time and file budget"""
+        deadline = time.monotonic() + self.time_budget
+        total_size = 0
+        item_count = 0
+        truncated = False
+        stack = [path]
+        try:
+            while stack and not truncated:
+                try:
+                    with os.scandir(stack.pop()) as entries:
+                        for entry in entries:
+                            item_count += 1
+                            try:
+                                if entry.is_dir():
+                                    # Don't descend into symlinked directories
+                                    if not entry.is_symlink():
+                                        stack.append(entry.path)
+                                else:
+                                    total_size += entry.stat().st_size
+                            except OSError:
+                                pass
+                            if item_count >= self.max_files or time.monotonic() > deadline:
+                                truncated = True
+                                break
+                except OSError:
+                    continue
+        finally:
+            with self._lock:
+                self._pending.discard((path, mtime))
+                if len(self._cache) >= self.max_entries:
+                    # Drop the oldest entry
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[path] = (mtime, {'items': item_count, 'size': total_size, 'truncated': truncated})
+
+        # Redraw the prompt so the completion menu picks up the new numbers
+        app = get_app_or_none()
+        if app is not None:
+            app.invalidate()
+
+# Shared directory stats cache used by `cd` completion
+dir_stats_cache = DirectoryStatsCache()
+
+class EntryStatCache:
+    """os.stat results for completion rows, refreshed by a background worker so rendering never stats"""
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # path -> (completion generation it was stat'ed for, stat result or None if the stat failed)
+        self._cache: Dict[str, Tuple[int, Optional[os.stat_result]]] = {}
+        self._pending: Set[str] = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self, path: str, generation: int) -> Optional[os.stat_result]:
+        """Return the last stat of a path (None until known); re-stat it in the background once per completion"""
+        with self._lock:
+            cached = self._cache.get(path)
+            if (cached is None or cached[0] != generation) and path not in self._pending:
+                self._pending.add(path)
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='entry-stat')
+                self._executor.submit(self._stat, path, generation)
+        return cached[1] if cached is not None else None
+
+    def _stat(self, path: str, generation: int):
+        """Stat a path and store the result"""
+        try:
+            result = os.stat(path)
+        except OSError:
+            result = None
+        with self._lock:
+            self._pending.discard(path)
+            previous = self._cache.pop(path, None)
+            if len(self._cache) >= self.max_entries:
+                # Drop the oldest entry
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[path] = (generation, result)
+
+        # Redraw only if the row's text changes
+        if previous is None or previous[1] != result:
+            app = get_app_or_none()
+            if app is not None:
+                app.invalidate()
+
+# Shared stat cache used by the completion menu's file and directory descriptions
+entry_stat_cache = EntryStatCache()
+
+class FrecencyStore:
+    """Frecency (frequency x recency) scores for commands and directories, kept in an append-only log"""
+    def __init__(self, log_file: Optional[str] = None, half_life: float = 7 * 24 * 3600,
+                 min_score: float = 0.05, max_entries: int = 5000):
+        self.log_file = log_file or os.path.join(os.path.expanduser('~'), '.terminal_frecency')
+        # A use loses half its weight after this many seconds
+        self.half_life = half_life
+        # Entries that decay below min_score are dropped when the log is compacted
+        self.min_score = min_score
+        self.max_entries = max_entries
+        # (kind, key) -> (rank, last used timestamp)
+        self._entries: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._log_lines = 0
+        self._loaded = False
+        # kind -> (entries version, timestamp, {key: score}) used by completion ordering
+        self._snapshots: Dict[str, Tuple[int, float, Dict[str, float]]] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _decayed(self, rank: float, last_used: float, now: float) -> float:
+        """Apply exponential decay to a rank"""
+        return rank * 0.5 ** (max(0.0, now - last_used) / self.half_life)
+
+    def _load(self):
+        """Replay the log; later lines for the same key supersede earlier ones"""
+        self._loaded = True
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        kind, last_used, rank, key = line.rstrip('\n').split('\t', 3)
+                        self._entries[(kind, key)] = (float(rank), float(last_used))
+                        self._log_lines += 1
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+
+    def record(self, kind: str, key: str):
+        """Record one use of a command or directory"""
+        if not key or '\t' in key or '\n' in key:
+            return
+        now = time.time()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            rank, last_used = self._entries.get((kind, key), (0.0, now))
+            rank = self._decayed(rank, last_used, now) + 1
+            self._entries[(kind, key)] = (rank, now)
+            self._version += 1
+            try:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(f"{kind}\t{now:.0f}\t{rank:.4f}\t{key}\n")
+                self._log_lines += 1
+            except OSError:
+                pass
+            
+            # Compact once the log holds far more lines than live entries
+            if self._log_lines > 4 * len(self._entries) + 200:
+                self._compact(now)
+
+    def _compact(self, now: float):
+        """Decay every entry to now, drop the faded ones and rewrite the log with one line per key"""
+        entries = {}
+        for (kind, key), (rank, last_used) in self._entries.items():
+            rank = self._decayed(rank, last_used, now)
+            if rank >= self.min_score:
+                entries[(kind, key)] = (rank, now)
+        if len(entries) > self.max_entries:
+            top = sorted(entries.items(), key=lambda item: -item[1][0])[:self.max_entries]
+            entries = dict(top)
+        
+        # A unique temp file next to the log, so two terminals compacting at once don't clobber each other
+        try:
+            fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(self.log_file) or '.',
+                                             prefix=os.path.basename(self.log_file) + '.', suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for (kind, key), (rank, last_used) in entries.items():
+                    f.write(f"{kind}\t{last_used:.0f}\t{rank:.4f}\t{key}\n")
+            set_replacement_mode(temp_file, self.log_file)
+            os.replace(temp_file, self.log_file)
+        except OSError:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            return
+        self._entries = entries
+        self._log_lines = len(entries)
+        self._version += 1
+
+    def scores(self, kind: str) -> Dict[str, float]:
+        """Return {key: score} for one kind, cached until the store changes or a minute passes"""
+        now = time.time()
+        snapshot = self._snapshots.get(kind)
+        if snapshot is not None and snapshot[0] == self._version and now - snapshot[1] < 60:
+            return snapshot[2]
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            scores = {key: self._decayed(rank, last_used, now)
+                      for (entry_kind, key), (rank, last_used) in self._entries.items() if entry_kind == kind}
+            self._snapshots[kind] = (self._version, now, scores)
+        return scores
+
+    def top(self, kind: str, count: int) -> List[str]:
+        """Return the highest scoring keys of one kind"""
+        scores = self.scores(kind)
+        return sorted(scores, key=lambda key: -scores[key])[:count]
+
+    def order(self, kind: str, items: list, key=None) -> list:
+        """Move frecent items to the front, highest score first; the rest keep their order"""
+        scores = self.scores(kind)
+        if not scores:
+            return items
+        key = key or (lambda item: item)
+        frecent = [item for item in items if key(item) in scores]
+        if not frecent:
+            return items
+        frecent.sort(key=lambda item: -scores[key(item)])
+        return frecent + [item for item in items if key(item) not in scores]
+
+# Shared frecency store for executed commands and visited directories
+frecency_store = FrecencyStore()
+
+def run_command_help(command: str, executable: Optional[str] = None) -> dict:
+    """Run a command's help and man summary, returning {'help': str, 'man': str}"""
+    result = {'help': '', 'man': ''}
+    
+    def run(args, shell=False, program=None):
+        proc = subprocess.Popen(
+            args,
+            executable=program,
+            shell=shell,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        try:
+            stdout, _ = proc.communicate(timeout=2)  # Timeout after 2 seconds
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return ''
+        return stdout or ''
+    
+    try:
+        # Try to execute help command
+        if platform.system() == 'Windows':
+            result['help'] = run(f"{command} /?", shell=True)
+        else:
+            # Run the resolved executable, but keep argv[0] so usage lines show the plain name
+            result['help'] = run([command, '--help'], program=executable)
+    except Exception:
+        pass
+    
+    # Man page summary (Unix-like systems)
+    if platform.system() != 'Windows':
+        for args in (['man', '-f', command], ['whatis', command]):
+            try:
+                result['man'] = run(args)
+            except Exception:
+                continue
+            if result['man']:
+                break
+    return result
+
+def summarize_help(help_info: dict) -> str:
+    """Reduce help output to a one-line summary"""
+    # Prefer the man page description: "ls (1) - list directory contents"
+    for line in help_info.get('man', '').splitlines():
+        if ' - ' in line:
+            return line.split(' - ', 1)[1].strip()
+    for line in help_info.get('help', '').splitlines():
+        line = line.strip()
+        if line and not line.lower().startswith('usage'):
+            return line if len(line) <= 60 else line[:57] + '...'
+    return ''
+
+class HelpCache:
+    """On-disk cache of command help, keyed by the resolved executable path and its mtime"""
+    def __init__(self, cache_file: Optional[str] = None, summary_file: Optional[str] = None,
+                 max_workers: int = 2, max_entries: int = 500, save_delay: float = 2.0):
+        self.cache_file = cache_file or os.path.join(os.path.expanduser('~'), '.terminal_help_cache.json')
+        # The one-line summaries shown in the completion menu live in a small file of their own
+        self.summary_file = summary_file or os.path.join(os.path.expanduser('~'), '.terminal_help_summaries.json')
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        # Changes are written in one batch, save_delay seconds after the first one
+        self.save_delay = save_delay
+        # executable path -> {'mtime': float, 'help': str, 'man': str, 'summary': str}
+        self._entries: Dict[str, dict] = {}
+        # executable path -> one-line summary
+        self._summaries: Dict[str, str] = {}
+        self._pending: Set[str] = set()
+        self._loaded = False
+        self._summaries_loaded = False
+        self._dirty = False
+        self._save_timer = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _load(self):
+        """Load the cache from disk"""
+        self._loaded = True
+        try:
+            with open(self.cache_file, 'r') as f:
+                self._entries = json.load(f)
+        except Exception:
+            self._entries = {}
+
+    def _load_summaries(self):
+        """Load the summaries from disk"""
+        self._summaries_loaded = True
+        try:
+            with open(self.summary_file, 'r') as f:
+                self._summaries = json.load(f)
+        except Exception:
+            self._summaries = {}
+
+    def _schedule_save(self):
+        """Mark the cache changed and make sure a save is coming (called with the lock held)"""
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Write pending changes (to temp files, then swapped in)"""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                # Snapshots, so the lock isn't held while writing
+                entries = dict(self._entries)
+                summaries = dict(self._summaries)
+            try:
+                write_json_atomic(self.cache_file, entries, durable=False)
+                write_json_atomic(self.summary_file, summaries, durable=False)
+            except Exception:
+                pass
+
+    def get(self, command: str) -> dict:
+        """Return help for a command, running it only if the cached copy is missing or stale"""
+        executable = command_index.resolve(command)
+        try:
+            mtime = os.stat(executable).st_mtime if executable else None
+        except OSError:
+            mtime = None
+        key = executable or command
+        
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not self._summaries_loaded:
+                self._load_summaries()
+            cached = self._entries.get(key)
+            if cached is not None and cached.get('mtime') == mtime:
+                if key not in self._summaries:
+                    # Entries cached before summaries had their own file
+                    self._summaries[key] = cached.get('summary', '')
+                    self._schedule_save()
+                return cached
+        
+        help_info = run_command_help(command, executable)
+        help_info['summary'] = summarize_help(help_info)
+        help_info['mtime'] = mtime
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the oldest entry
+                oldest = next(iter(self._entries))
+                self._entries.pop(oldest)
+                self._summaries.pop(oldest, None)
+            self._entries[key] = help_info
+            self._summaries[key] = help_info['summary']
+            self._schedule_save()
+        return help_info
+
+    def summary(self, command: str) -> str:
+        """Return the cached one-line summary for a command without spawning anything"""
+        if not self._summaries_loaded:
+            with self._lock:
+                if not self._summaries_loaded:
+                    self._load_summaries()
+        if not command_index.is_indexed(command):
+            # Builtins and names off PATH: only a summary stored under the bare name, without searching PATH
+            return self._summaries.get(command, '')
+        executable = command_index.resolve(command)
+        return self._summaries.get(executable or command, '')
+
+    def prefetch(self, commands: List[str]):
+        """Fetch help for commands in a background pool"""
+        # Only commands found on PATH: running `--help` on a script like ./deploy.sh may just run it
+        commands = [command for command in commands
+                    if not any(sep and sep in command for sep in (os.sep, os.altsep, '/'))
+                    and command_index.is_indexed(command)]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='help-prefetch')
+            for command in commands:
+                if command not in self._pending:
+                    self._pending.add(command)
+                    self._executor.submit(self._prefetch_one, command)
+
+    def _prefetch_one(self, command: str):
+        """Fetch help for a single command, ignoring failures"""
+        try:
+            self.get(command)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(command)
+
+# Shared help cache for `help <cmd>` and command completion summaries
+help_cache = HelpCache()
+atexit.register(help_cache.flush)
+
+class FuzzyMatcher:
+    """fzf-style fuzzy subsequence matcher with scoring, tuned for large candidate lists"""
+    # Characters after which a match counts as the start of a word
+    BOUNDARY_CHARS = frozenset('/\\-_. :')
+
+    def __init__(self, time_budget: float = 0.05):
+        # Seconds a single match() call may spend before returning what it has
+        self.time_budget = time_budget
+        # (candidate list, its lowercased copy), replaced as one tuple since completion threads share the matcher
+        self._lowered = (None, [])
+        # (candidates, query, matching indices) of the last complete match, for incremental narrowing
+        self._last = None
+
+    def _get_lowered(self, candidates: List[str]) -> List[str]:
+        """Return the lowercased candidates, computed once per candidate list"""
+        source, lowered = self._lowered
+        if candidates is not source:
+            lowered = [candidate.lower() for candidate in candidates]
+            self._lowered = (candidates, lowered)
+        return lowered
+
+    def score(self, query: str, text: str) -> Optional[int]:
+        """Score a lowercased candidate against a lowercased query, or None if it doesn't match"""
+        # Forward pass: find where the leftmost complete match ends
+        pos = -1
+        for char in query:
+            pos = text.find(char, pos + 1)
+            if pos < 0:
+                return None
+        end = pos
+        
+        # Backward pass: find the shortest window ending there
+        pos = end + 1
+        for char in reversed(query):
+            pos = text.rfind(char, 0, pos)
+        start = pos
+        
+        # Reward consecutive characters and word-boundary hits, penalize gaps
+        score = 0
+        previous = -2
+        pos = start - 1
+        for char in query:
+            pos = text.find(char, pos + 1)
+            score += 16
+            if pos == previous + 1:
+                score += 8
+            elif pos == 0 or text[pos - 1] in self.BOUNDARY_CHARS:
+                score += 10
+            previous = pos
+        score -= (end - start + 1) - len(query)
+        return score
+
+    def match(self, query: str, candidates: List[str]) -> List[int]:
+        """Return the indices of the candidates matching query, best match first"""
+        query = query.lower()
+        if not query:
+            return list(range(len(candidates)))
+        lowered = self._get_lowered(candidates)
+        
+        # If the query only grew, narrow the previous result set instead of rescanning everything
+        last = self._last
+        if last is not None and last[0] is candidates and query.startswith(last[1]):
+            indices = last[2]
+        else:
+            indices = range(len(candidates))
+        
+        # Cheap subsequence filter at regex speed: "abc" -> "a[^b]*b[^c]*c", which can't backtrack badly
+        escaped = [re.escape(char) for char in query]
+        search = re.compile(escaped[0] + ''.join(f'[^{char}]*{char}' for char in escaped[1:])).search
+        deadline = time.monotonic() + self.time_budget
+        matched = []
+        complete = True
+        for n, i in enumerate(indices):
+            if n & 1023 == 1023 and time.monotonic() > deadline:
+                complete = False
+                break
+            if search(lowered[i]):
+                matched.append(i)
+        self._last = (candidates, query, matched) if complete else None
+        
+        # Rank as many survivors as the budget allows; the rest keep their original order
+        scored = []
+        ranked = len(matched)
+        for n, i in enumerate(matched):
+            if n & 255 == 255 and time.monotonic() > deadline:
+                ranked = n
+                break
+            text = lowered[i]
+            scored.append((-self.score(query, text), len(text), i))
+        scored.sort()
+        return [i for _, _, i in scored] + matched[ranked:]
+
 class ProfessionalCompleter(Completer):
     """Professional completer with smart command and file completion"""
-    def __init__(self):
+    # Supported ways of matching the typed text against candidates
+    MATCH_MODES = ('prefix', 'fuzzy')
+
+    def __init__(self, match_mode: str = 'prefix', history=None):
+        self.match_mode = match_mode if match_mode in self.MATCH_MODES else 'prefix'
+        # Command history, offered as fuzzy candidates for the whole line
+        self.history = history
         # Command-specific completers
         self.command_completers = {
             'cd': self._complete_directories,
@@ -81,9 +850,28 @@ class ProfessionalCompleter(Completer):
             'move': self._complete_files,
             'mv': self._complete_files
         }
+        # Sorted command-name array used for prefix lookups, rebuilt when the PATH index changes
+        self._candidates: List[str] = []
+        self._candidates_source = None
+        # Recent directory listings: path -> (mtime, sorted match keys, DirEntry objects)
+        self._listing_cache: Dict[str, Tuple[float, List[str], List[os.DirEntry]]] = {}
+        # Completions run in a background thread; each request gets a generation number so
+        # stale requests stop as soon as the user types again
+        self._generations = itertools.count(1)
+        self._generation = 0
+        # Seconds an uncached directory scan may take before results start streaming
+        self.stream_after = 0.1
+        # One matcher per candidate source so each can narrow its own previous results
+        self._fuzzy = {'commands': FuzzyMatcher(), 'files': FuzzyMatcher(), 'history': FuzzyMatcher()}
+        self._history_source = None
+        self._history_candidates: List[str] = []
 
     def get_completions(self, document: Document, complete_event: CompleteEvent):
         """Get completions based on the current context"""
+        # Every new request supersedes the ones still running in other threads
+        generation = next(self._generations)
+        self._generation = generation
+        
         word = document.get_word_before_cursor()
         line = document.text.strip()
         
@@ -94,11 +882,18 @@ class ProfessionalCompleter(Completer):
         if len(parts) <= 1:
             # Get available commands that match the current word
             for cmd_name in self._get_available_commands(word):
+                if self._is_stale(generation):
+                    return
                 yield Completion(
                     cmd_name,
                     start_position=-len(word),  # Replace the partial word
-                    display=cmd_name
+                    display=cmd_name,
+                    display_meta=self._command_meta(cmd_name)
                 )
+            
+            # In fuzzy mode, also offer matching lines from the command history
+            if self.match_mode == 'fuzzy':
+                yield from self._complete_history(document.text_before_cursor, generation)
             return
 
         # Get the command being used
@@ -111,290 +906,274 @@ class ProfessionalCompleter(Completer):
             
             # If we're at the start of the path (just after 'cd '), show all directories
             if not current_text:
-                yield from self._complete_directories('')
+                yield from self._complete_directories('', generation)
             else:
                 # Use the current text as the path for completion
-                yield from self._complete_directories(current_text)
+                yield from self._complete_directories(current_text, generation)
             return
         
         # If we have a specific completer for this command, use it
         if command in self.command_completers:
-            yield from self.command_completers[command](word)
+            yield from self.command_completers[command](word, generation)
             return
 
         # Default to file and directory completion
-        yield from self._complete_files_and_dirs(word)
+        yield from self._complete_files_and_dirs(word, generation)
 
-    def _get_available_commands(self, word: str):
-        """Get available commands that match the current word from all OS paths"""
-        commands = set()
+    def _command_meta(self, command: str):
+        """Return a lazy meta text showing the cached help summary of a command"""
+        return lambda: help_cache.summary(command)
+
+    def _get_command_candidates(self) -> List[str]:
+        """Return the sorted array of all command names (PATH index plus built-ins)"""
+        commands = command_index.commands()
+        if self._candidates_source is commands:
+            return self._candidates
+        
+        candidates = set(commands)
         
         # Add special terminal commands that are always available
-        special_commands = ['cd', 'customize', 'help', 'exit', 'quit']
-        for cmd in special_commands:
-            if cmd.startswith(word.lower()):
-                commands.add(cmd)
+        candidates.update(['cd', 'customize', 'help', 'exit', 'quit', 'stats', 'pty', 'jobs', 'fg', 'bg', 'par'])
         
-        # Get PATH environment variable based on OS
+        # Add OS-specific built-in commands that might not be in PATH
         if platform.system() == 'Windows':
-            path = os.environ.get('PATH', '').split(';')
-            # Windows executable extensions
-            extensions = ['.exe', '.bat', '.cmd', '.ps1', '.com', '.vbs']
+            # Windows built-ins that might not be in PATH
+            candidates.update(['cls', 'dir', 'echo', 'type', 'copy', 'move', 'del', 'ren', 'md', 'rd'])
         else:
-            path = os.environ.get('PATH', '').split(':')
-            extensions = ['']  # Unix-like systems don't require extensions
+            # Unix built-ins that might not be in PATH
+            candidates.update(['ls', 'echo', 'pwd', 'cat', 'cp', 'mv', 'rm', 'mkdir', 'rmdir', 'clear'])
         
-        # Scan each directory in PATH
-        for directory in path:
-            if not directory or not os.path.exists(directory):
-                continue
-                
-            try:
-                # List all files in the directory
-                for file in os.listdir(directory):
-                    file_lower = file.lower()
-                    
-                    # Skip if doesn't match the word prefix
-                    if not file_lower.startswith(word.lower()):
-                        continue
-                        
-                    file_path = os.path.join(directory, file)
-                    if not os.path.isfile(file_path):
-                        continue
-                        
-                    # Handle platform-specific executable detection
-                    is_executable = False
-                    
-                    if platform.system() == 'Windows':
-                        # Windows: check for executable extensions
-                        is_executable = any(file_lower.endswith(ext) for ext in extensions)
-                        if is_executable:
-                            # Remove extension for Windows commands
-                            base_name = os.path.splitext(file_lower)[0]
-                            commands.add(base_name)
-                    else:
-                        # Unix-like: check if file has execute permission
-                        is_executable = os.access(file_path, os.X_OK)
-                        if is_executable:
-                            commands.add(file_lower)
-            except (PermissionError, OSError, FileNotFoundError) as e:
-                # Skip directories we can't access
+        self._candidates = sorted(candidates)
+        self._candidates_source = commands
+        return self._candidates
+
+    def _get_available_commands(self, word: str):
+        """Get available commands that match the current word from all OS paths"""
+        candidates = self._get_command_candidates()
+        prefix = word.lower()
+        if self.match_mode == 'fuzzy' and prefix:
+            matches = [candidates[i] for i in self._fuzzy['commands'].match(prefix, candidates)]
+        else:
+            # Prefix lookup in the sorted array: matches form one contiguous, already ordered slice
+            start = bisect.bisect_left(candidates, prefix)
+            end = bisect.bisect_left(candidates, prefix + '\U0010ffff', start)
+            matches = candidates[start:end]
+        
+        # Frequently and recently used commands go first
+        return frecency_store.order('command', matches)
+
+    def _complete_history(self, text: str, generation: int, limit: int = 20):
+        """Yield history lines that fuzzily match the text before the cursor"""
+        if self.history is None or not text.strip():
+            return
+        
+        # Most recent first, without duplicates; rebuilt only when the history grows
+        strings = self.history.get_strings()
+        if self._history_source != len(strings):
+            self._history_candidates = list(dict.fromkeys(reversed(strings)))
+            self._history_source = len(strings)
+        candidates = self._history_candidates
+        
+        for i in self._fuzzy['history'].match(text, candidates)[:limit]:
+            if self._is_stale(generation):
+                return
+            yield Completion(
+                candidates[i],
+                start_position=-len(text),  # Replace the whole line
+                display=candidates[i],
+                display_meta="History"
+            )
+
+    def _is_stale(self, generation: int) -> bool:
+        """Check whether a newer completion request has superseded this one"""
+        return generation != self._generation
+
+    def _split_partial_path(self, word: str) -> Tuple[str, str]:
+        """Split a partial path into the absolute directory to list and the name prefix to match"""
+        path = word
+        if platform.system() == 'Windows':
+            path = path.replace('/', '\\')
+        
+        dirname = os.path.dirname(path)
+        if not dirname:
+            dirname = '.'
+        prefix = os.path.basename(path)
+        if platform.system() == 'Windows':
+            prefix = prefix.lower()
+        return os.path.abspath(dirname), prefix
+
+    def _match_key(self, name: str) -> str:
+        """Return the key used to match and sort directory entries"""
+        return name.lower() if platform.system() == 'Windows' else name
+
+    def _store_listing(self, path: str, mtime: float, dir_entries: List[os.DirEntry]):
+        """Cache a directory listing sorted by match key"""
+        dir_entries.sort(key=lambda entry: self._match_key(entry.name))
+        keys = [self._match_key(entry.name) for entry in dir_entries]
+        if len(self._listing_cache) >= 8:
+            # Drop the oldest listing
+            self._listing_cache.pop(next(iter(self._listing_cache)))
+        self._listing_cache[path] = (mtime, keys, dir_entries)
+
+    def _make_items(self, entries: List[os.DirEntry], prefix: str, show_hidden: bool, make_item, base: str) -> list:
+        """Turn the entries matching prefix into (display, meta) items"""
+        items = []
+        for entry in entries:
+            if not show_hidden and entry.name.startswith('.'):
                 continue
-            except Exception:
-                # Skip any other errors and continue with next directory
+            if not self._match_key(entry.name).startswith(prefix):
                 continue
+            item = make_item(entry, base)
+            if item is not None:
+                items.append(item)
+        return items
+
+    def _complete_paths(self, word: str, generation: int, make_item, frecency_kind: Optional[str] = None):
+        """Yield path completions for the entries that make_item turns into (display, meta) pairs"""
+        base, prefix = self._split_partial_path(word)
+        # Like glob, hide dotfiles unless the partial name starts with a dot
+        show_hidden = prefix.startswith('.')
+        fuzzy = self.match_mode == 'fuzzy' and bool(prefix)
         
-        # Add OS-specific built-in commands that might not be in PATH
-        if platform.system() == 'Windows':
-            # Windows built-ins that might not be in PATH
-            win_builtins = ['cls', 'dir', 'echo', 'type', 'copy', 'move', 'del', 'ren', 'md', 'rd']
-            for cmd in win_builtins:
-                if cmd.startswith(word.lower()):
-                    commands.add(cmd)
+        # Listings are cached until the directory's mtime changes
+        mtime = os.stat(base).st_mtime
+        cached = self._listing_cache.get(base)
+        if cached is None or cached[0] != mtime:
+            # Scan the directory; if that is slow (e.g. on network mounts), stream prefix
+            # matches as they are found. Fuzzy ranking needs the whole listing first.
+            scanned = []
+            streaming = False
+            deadline = time.monotonic() + self.stream_after
+            with os.scandir(base) as it:
+                for entry in it:
+                    if streaming:
+                        items = self._make_items([entry], prefix, show_hidden, make_item, base)
+                        yield from self._yield_path_completions(items, word, generation, common_prefix=False)
+                    scanned.append(entry)
+                    if len(scanned) % 256 == 0:
+                        if self._is_stale(generation):
+                            return
+                        if not fuzzy and not streaming and time.monotonic() > deadline:
+                            # Flush the matches found so far, then stream the rest as they are found
+                            streaming = True
+                            items = self._make_items(scanned, prefix, show_hidden, make_item, base)
+                            yield from self._yield_path_completions(items, word, generation, common_prefix=False)
+            
+            self._store_listing(base, mtime, scanned)
+            if streaming:
+                return
+            cached = self._listing_cache[base]
+        
+        _, keys, dir_entries = cached
+        if fuzzy:
+            # Ranked by match quality, best first
+            items = []
+            for i in self._fuzzy['files'].match(prefix, keys):
+                entry = dir_entries[i]
+                if show_hidden or not entry.name.startswith('.'):
+                    item = make_item(entry, base)
+                    if item is not None:
+                        items.append(item)
         else:
-            # Unix built-ins that might not be in PATH
-            unix_builtins = ['ls', 'echo', 'pwd', 'cat', 'cp', 'mv', 'rm', 'mkdir', 'rmdir', 'clear']
-            for cmd in unix_builtins:
-                if cmd.startswith(word.lower()):
-                    commands.add(cmd)
+            # Matches form one contiguous slice of the sorted listing
+            start = bisect.bisect_left(keys, prefix)
+            end = bisect.bisect_left(keys, prefix + '\U0010ffff', start)
+            items = self._make_items(dir_entries[start:end], prefix, show_hidden, make_item, base)
+            # Sort items by name
+            items.sort(key=lambda x: x[0].lower())
         
-        return sorted(commands)
+        if frecency_kind:
+            # Frequently and recently visited entries go first
+            items = frecency_store.order(frecency_kind, items,
+                                         key=lambda item: os.path.join(base, item[0].rstrip(os.sep)))
+        yield from self._yield_path_completions(items, word, generation, common_prefix=not fuzzy, sort=False)
 
-    def _complete_directories(self, word: str):
-        """Complete only directories with descriptions"""
-        try:
-            path = word or '.'
-            if platform.system() == 'Windows':
-                path = path.replace('/', '\\')
-            
-            dirname = os.path.dirname(path)
-            if not dirname:
-                dirname = '.'
-            pattern = os.path.basename(path) + '*'
-            
-            # Get all matching directories
-            dirs = []
-            for p in glob.glob(os.path.join(dirname, pattern)):
-                if os.path.isdir(p):
-                    # Get directory size and item count
-                    try:
-                        total_size = 0
-                        item_count = 0
-                        for dirpath, dirnames, filenames in os.walk(p):
-                            for f in filenames:
-                                fp = os.path.join(dirpath, f)
-                                if os.path.exists(fp):
-                                    total_size += os.path.getsize(fp)
-                            item_count += len(filenames) + len(dirnames)
-                        
-                        # Format size
-                        if total_size < 1024:
-                            size_str = f"{total_size} B"
-                        elif total_size < 1024 * 1024:
-                            size_str = f"{total_size/1024:.1f} KB"
-                        else:
-                            size_str = f"{total_size/(1024*1024):.1f} MB"
-                            
-                        # Get last modified time
-                        mtime = os.path.getmtime(p)
-                        last_modified = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M')
-                        
-                        # Create display string
-                        display = os.path.basename(p) + os.sep
-                        meta = f"Items: {item_count} | Size: {size_str} | Modified: {last_modified}"
-                        dirs.append((display, meta, p))
-                    except Exception:
-                        # If we can't get details, just show the directory name
-                        display = os.path.basename(p) + os.sep
-                        dirs.append((display, "Directory", p))
-            
-            # Sort directories by name
-            dirs.sort(key=lambda x: x[0].lower())
-            
-            # If there's only one match, autofill it
-            if len(dirs) == 1:
-                display, meta, _ = dirs[0]
+    def _yield_path_completions(self, items: list, word: str, generation: int, common_prefix: bool = True,
+                                sort: bool = True):
+        """Yield path completions sorted by name, offering the common prefix when ambiguous"""
+        # Sort items by name
+        if sort:
+            items.sort(key=lambda x: x[0].lower())
+        start_position = -len(os.path.basename(word))  # Replace the partial word
+        
+        # Find common prefix among all matches
+        if common_prefix and len(items) > 1:
+            prefix = os.path.commonprefix([i[0] for i in items])
+            if prefix and prefix != os.path.basename(word):
                 yield Completion(
-                    display,
-                    start_position=-len(os.path.basename(word)),  # Replace the partial word
-                    display=display,
-                    display_meta=meta
+                    prefix,
+                    start_position=start_position,
+                    display=prefix,
+                    display_meta="Common prefix"
                 )
-            else:
-                # Find common prefix among all matches
-                if dirs:
-                    common_prefix = os.path.commonprefix([d[0] for d in dirs])
-                    if common_prefix and common_prefix != os.path.basename(path):
-                        yield Completion(
-                            common_prefix,
-                            start_position=-len(os.path.basename(word)),  # Replace the partial word
-                            display=common_prefix,
-                            display_meta="Common prefix"
-                        )
-                
-                # Yield all completions
-                for display, meta, _ in dirs:
-                    yield Completion(
-                        display,
-                        start_position=-len(os.path.basename(word)),  # Replace the partial word
-                        display=display,
-                        display_meta=meta
-                    )
-                
+        
+        # Yield all completions (a single match simply autofills)
+        for display, meta in items:
+            if self._is_stale(generation):
+                return
+            yield Completion(
+                display,
+                start_position=start_position,
+                display=display,
+                display_meta=meta
+            )
+
+    def _complete_directories(self, word: str, generation: int):
+        """Complete only directories with descriptions"""
+        def make_item(entry, base):
+            if entry.is_dir():
+                return entry.name + os.sep, self._directory_meta(entry, os.path.join(base, entry.name))
+        try:
+            yield from self._complete_paths(word, generation, make_item, frecency_kind='directory')
         except Exception:
             pass
 
-    def _complete_files(self, word: str):
+    def _complete_files(self, word: str, generation: int):
         """Complete only files with descriptions"""
+        def make_item(entry, base):
+            if entry.is_file():
+                return entry.name, self._file_meta(entry)
         try:
-            path = word or '.'
-            if platform.system() == 'Windows':
-                path = path.replace('/', '\\')
-            
-            dirname = os.path.dirname(path)
-            if not dirname:
-                dirname = '.'
-            pattern = os.path.basename(path) + '*'
-            
-            # Get all matching files
-            files = []
-            for p in glob.glob(os.path.join(dirname, pattern)):
-                if os.path.isfile(p):
-                    display = os.path.basename(p)
-                    files.append((display, f"File ({os.path.getsize(p)} bytes)"))
-            
-            # Sort files by name
-            files.sort(key=lambda x: x[0].lower())
-            
-            # If there's only one match, autofill it
-            if len(files) == 1:
-                display, meta = files[0]
-                yield Completion(
-                    display,
-                    start_position=-len(os.path.basename(word)),  # Replace the partial word
-                    display=display,
-                    display_meta=meta
-                )
-            else:
-                # Find common prefix among all matches
-                if files:
-                    common_prefix = os.path.commonprefix([f[0] for f in files])
-                    if common_prefix and common_prefix != os.path.basename(path):
-                        yield Completion(
-                            common_prefix,
-                            start_position=-len(os.path.basename(word)),  # Replace the partial word
-                            display=common_prefix,
-                            display_meta="Common prefix"
-                        )
-                
-                # Yield all completions
-                for display, meta in files:
-                    yield Completion(
-                        display,
-                        start_position=-len(os.path.basename(word)),  # Replace the partial word
-                        display=display,
-                        display_meta=meta
-                    )
+            yield from self._complete_paths(word, generation, make_item)
         except Exception:
             pass
 
-    def _complete_files_and_dirs(self, word: str):
+    def _complete_files_and_dirs(self, word: str, generation: int):
         """Complete both files and directories with descriptions"""
+        def make_item(entry, base):
+            if entry.is_dir():
+                return entry.name + os.sep, "Directory"
+            return entry.name, self._file_meta(entry)
         try:
-            path = word or '.'
-            if platform.system() == 'Windows':
-                path = path.replace('/', '\\')
-            
-            dirname = os.path.dirname(path)
-            if not dirname:
-                dirname = '.'
-            pattern = os.path.basename(path) + '*'
-            
-            # Get all matching files and directories
-            items = []
-            for p in glob.glob(os.path.join(dirname, pattern)):
-                if os.path.isdir(p):
-                    display = os.path.basename(p) + os.sep
-                    items.append((display, "Directory"))
-                else:
-                    display = os.path.basename(p)
-                    items.append((display, f"File ({os.path.getsize(p)} bytes)"))
-            
-            # Sort items by name
-            items.sort(key=lambda x: x[0].lower())
-            
-            # If there's only one match, autofill it
-            if len(items) == 1:
-                display, meta = items[0]
-                yield Completion(
-                    display,
-                    start_position=-len(os.path.basename(word)),  # Replace the partial word
-                    display=display,
-                    display_meta=meta
-                )
-            else:
-                # Find common prefix among all matches
-                if items:
-                    common_prefix = os.path.commonprefix([i[0] for i in items])
-                    if common_prefix and common_prefix != os.path.basename(path):
-                        yield Completion(
-                            common_prefix,
-                            start_position=-len(os.path.basename(word)),  # Replace the partial word
-                            display=common_prefix,
-                            display_meta="Common prefix"
-                        )
-                
-                # Yield all completions
-                for display, meta in items:
-                    yield Completion(
-                        display,
-                        start_position=-len(os.path.basename(word)),  # Replace the partial word
-                        display=display,
-                        display_meta=meta
-                    )
+            yield from self._complete_paths(word, generation, make_item)
         except Exception:
             pass
 
+    def _file_meta(self, entry: os.DirEntry):
+        """Return a lazy meta text for a file; the size comes from the background stat cache"""
+        def meta():
+            # Not entry.stat(): entries are reused from the listing cache, and DirEntry.stat() caches its result
+            stat = entry_stat_cache.get(entry.path, self._generation)
+            if stat is None:
+                return "File"
+            return f"File ({stat.st_size} bytes)"
+        return meta
+
+    def _directory_meta(self, entry: os.DirEntry, path: str):
+        """Return a lazy meta text for a directory that shows its stats once they are computed"""
+        def meta():
+            stat = entry_stat_cache.get(entry.path, self._generation)
+            if stat is None:
+                return "Directory"
+            last_modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
+            stats = dir_stats_cache.get(path, stat.st_mtime)
+            if stats is None:
+                return f"Items: calculating… | Modified: {last_modified}"
+            suffix = '+' if stats['truncated'] else ''
+            return (f"Items: {stats['items']}{suffix} | Size: {format_size(stats['size'])}{suffix} | "
+                    f"Modified: {last_modified}")
+        return meta
+
     def _get_command_help(self, command: str) -> str:
         """Get detailed help for a command"""
         help_text = ""
@@ -407,23 +1186,10 @@ class ProfessionalCompleter(Completer):
         elif command == 'help':
             return "Terminal command: Get help for a specific command"
             
-        # Try to get help from system command
+        # Try to get help from system command (cached on disk)
         try:
-            # Try to execute help command
-            if platform.system() == 'Windows':
-                help_cmd = f"{command} /?"
-            else:
-                help_cmd = f"{command} --help"
-                
-            proc = subprocess.Popen(
-                help_cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            stdout, stderr = proc.communicate(timeout=2)  # Timeout after 2 seconds
-            
+            help_info = help_cache.get(command)
+            stdout = help_info.get('help', '')
             if stdout:
                 # Limit output to avoid overwhelming display
                 lines = stdout.split('\n')
@@ -436,22 +1202,12 @@ class ProfessionalCompleter(Completer):
                 help_text += output
                 return help_text
             
-            # If no stdout, try man page summary (Unix-like systems)
-            if platform.system() != 'Windows':
-                proc = subprocess.Popen(
-                    f"man -f {command} 2>/dev/null || whatis {command} 2>/dev/null",
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                stdout, stderr = proc.communicate(timeout=2)
-                
-                if stdout:
-                    help_text = f"System Command: {command}\n\n"
-                    help_text += stdout
-                    help_text += f"\n\nUse 'man {command}' for more information."
-                    return help_text
+            # If no help output, use the man page summary (Unix-like systems)
+            if help_info.get('man'):
+                help_text = f"System Command: {command}\n\n"
+                help_text += help_info['man']
+                help_text += f"\n\nUse 'man {command}' for more information."
+                return help_text
         except Exception:
             pass
         
@@ -473,16 +1229,176 @@ def get_system_shell():
         # Unix-like systems - get from environment or use /bin/bash as fallback
         return os.environ.get('SHELL', '/bin/bash')
 
-def show_loading_animation():
-    """Show a professional loading animation when terminal starts"""
-    try:
-        # Use rich for animation if available
+class SystemInfoProvider:
+    """Collects the banner's system information concurrently, with a timeout per item"""
+    # All items, in the order the banner shows them
+    ITEMS = ('OS', 'Shell', 'Python', 'Time', 'Directory', 'Username', 'Hostname', 'Memory', 'CPU')
+    # Values that can't change while the terminal runs are collected once
+    STATIC_ITEMS = {'OS', 'Shell', 'Python', 'Username', 'Hostname'}
+    # Values that change are reused for live_ttl seconds (the loading screen and banner share them)
+    LIVE_ITEMS = {'Memory', 'CPU'}
+    FALLBACKS = {'Directory': "Unable to determine current directory", 'Username': "Unknown", 'Hostname': "Unknown"}
+    PLACEHOLDER = "…"
+
+    def __init__(self, timeout: float = 1.0, live_ttl: float = 2.0, cpu_sample: float = 0.2, max_workers: int = 4):
+        self.timeout = timeout
+        self.live_ttl = live_ttl
+        # CPU use is measured over at least cpu_sample seconds
+        self.cpu_sample = cpu_sample
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='system-info')
+        self._futures = {}
+        self._cpu_primed = None
+        self._lock = threading.Lock()
+        self._collectors = {
+            'OS': lambda: f"{platform.system()} {platform.release()}",
+            'Shell': get_system_shell,
+            'Python': platform.python_version,
+            'Time': lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'Directory': os.getcwd,
+            'Username': self._username,
+            'Hostname': lambda: platform.node() or "Unknown",
+            'Memory': self._memory,
+            'CPU': self._cpu
+        }
+
+    def prime(self):
+        """Start psutil's CPU measurement so the CPU item doesn't have to wait a full sample"""
+        import psutil
+        psutil.cpu_percent(interval=None)
+        self._cpu_primed = time.monotonic()
+
+    @staticmethod
+    def _username() -> str:
         try:
-            from rich.console import Console
-            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-            from time import sleep
-            
-            console = Console()
+            return os.getlogin()
+        except OSError:
+            import getpass
+            return getpass.getuser()
+
+    @staticmethod
+    def _memory() -> str:
+        import psutil
+        memory = psutil.virtual_memory()
+        return f"{memory.percent}% used ({memory.available / (1024*1024*1024):.1f} GB available)"
+
+    def _cpu(self) -> str:
+        import psutil
+        if self._cpu_primed is None:
+            cpu_percent = psutil.cpu_percent(interval=self.cpu_sample)
+        else:
+            # Measure from the priming call, waiting only for what's left of the sample
+            time.sleep(max(self._cpu_primed + self.cpu_sample - time.monotonic(), 0))
+            cpu_percent = psutil.cpu_percent(interval=None)
+            self._cpu_primed = time.monotonic()
+        return f"{cpu_percent}% used"
+
+    def fetch(self, items: List[str]) -> Dict[str, object]:
+        """Start collecting the given items; returns a future per item (cached ones are reused)"""
+        futures = {}
+        now = time.monotonic()
+        with self._lock:
+            for name in items:
+                collector = self._collectors.get(name)
+                if collector is None:
+                    continue
+                cached = self._futures.get(name)
+                if cached is not None:
+                    started, future = cached
+                    if name in self.STATIC_ITEMS or (name in self.LIVE_ITEMS and now - started < self.live_ttl):
+                        futures[name] = future
+                        continue
+                if name in self.STATIC_ITEMS or name in self.LIVE_ITEMS:
+                    future = self._executor.submit(collector)
+                    self._futures[name] = (now, future)
+                else:
+                    # Cheap and always current: computed right here
+                    future = Future()
+                    try:
+                        future.set_result(collector())
+                    except Exception as e:
+                        future.set_exception(e)
+                futures[name] = future
+        return futures
+
+    def values(self, futures: Dict[str, object], expired: bool = False) -> Dict[str, str]:
+        """Current values for fetched items: placeholders while pending, or timeouts once expired"""
+        values = {}
+        for name, future in futures.items():
+            if future.done():
+                try:
+                    values[name] = future.result()
+                except Exception:
+                    values[name] = self.FALLBACKS.get(name, "N/A")
+            else:
+                values[name] = "N/A (timed out)" if expired else self.PLACEHOLDER
+        return values
+
+system_info_provider = SystemInfoProvider()
+
+def start_system_monitors():
+    """Prime the CPU monitor and start collecting the banner's system information"""
+    system_info_provider.prime()
+    system_info_provider.fetch(enabled_info_items(load_banner_config()))
+
+def preload_history(history_file: str) -> FileHistory:
+    """Read the history file now so the first prompt doesn't have to"""
+    import asyncio
+    
+    history = FileHistory(history_file)
+    
+    async def consume():
+        # History.load() caches what it reads for the prompt session
+        async for _ in history.load():
+            pass
+    
+    asyncio.run(consume())
+    return history
+
+def get_startup_tasks() -> List[Tuple[str, str, object]]:
+    """Initialization work done while the loading screen is shown: (key, description, function)"""
+    history_file = os.path.join(os.path.expanduser('~'), '.terminal_history')
+    return [
+        ('config', "Loading configuration", lambda: (load_banner_config(), load_prompt_config(), load_style_config())),
+        ('commands', "Indexing commands in PATH", lambda: command_index.refresh()),
+        ('history', "Loading command history", lambda: preload_history(history_file)),
+        ('monitors', "Starting system monitors", start_system_monitors),
+        ('banner', "Rendering banner", lambda: banner_cache.body(load_banner_config())),
+    ]
+
+def run_startup_tasks(animate: bool = True) -> dict:
+    """Run the startup tasks concurrently; returns their results by key"""
+    tasks = get_startup_tasks()
+    results = {}
+
+    def run_all(on_done):
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = {executor.submit(func): (key, description) for key, description, func in tasks}
+            for future in as_completed(futures):
+                key, description = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception:
+                    # A failed task only loses its head start; everything is loaded again on demand
+                    results[key] = None
+                on_done(description)
+    
+    if not animate:
+        run_all(lambda description: None)
+        return results
+    
+    show_loading_animation(run_all, [description for _, description, _ in tasks])
+    return results
+
+def show_loading_animation(run_all=None, descriptions: Optional[List[str]] = None):
+    """Show a loading screen that tracks the startup tasks, finishing as soon as they are done"""
+    if run_all is None:
+        run_all, descriptions = (lambda on_done: None), []
+    # The startup tasks must run only once, even if the display fails partway
+    started = False
+    try:
+        # Use rich for animation if available
+        try:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
             
             # Create a nice introduction message
             intro_text = """
@@ -496,6 +1412,7 @@ def show_loading_animation():
             console.print(intro_text, style="bold cyan")
             console.print("Initializing Professional Terminal...\n", style="yellow")
             
+            colors = ['cyan', 'magenta', 'yellow', 'green', 'blue']
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[bold blue]{task.description}"),
@@ -504,165 +1421,171 @@ def show_loading_animation():
                 TimeElapsedColumn(),
                 console=console
             ) as progress:
-                load_system = progress.add_task("[cyan]Loading system information...", total=100)
-                load_modules = progress.add_task("[magenta]Initializing modules...", total=100)
-                load_ui = progress.add_task("[yellow]Preparing terminal interface...", total=100)
-                
-                # Simulate loading
-                for i in range(101):
-                    if i < 30:
-                        progress.update(load_system, completed=i * 3.33)
-                    elif i < 60:
-                        progress.update(load_modules, completed=(i - 30) * 3.33)
-                    else:
-                        progress.update(load_ui, completed=(i - 60) * 2.5)
-                    
-                    # Progress task completion logic
-                    if i == 30:
-                        progress.update(load_system, completed=100)
-                    if i == 60:
-                        progress.update(load_modules, completed=100)
-                    if i == 100:
-                        progress.update(load_ui, completed=100)
-                    
-                    sleep(0.01)  # Adjust speed here
-                
+                # One row per real task, completed when the task finishes
+                rows = {
+                    description: progress.add_task(f"[{colors[index % len(colors)]}]{description}...", total=1)
+                    for index, description in enumerate(descriptions)
+                }
+                started = True
+                run_all(lambda description: progress.update(rows[description], completed=1))
+            
             console.print("\n[bold green]System Ready![/bold green]\n")
         
-        # Fallback to simple animation if rich module fails
+        # Fallback to simple progress output if rich fails
         except (ImportError, Exception):
-            animation_frames = "|/-\\"
-            loading_text = "Starting Terminal"
-            
             # Use ANSI color codes for compatibility
             CYAN = '\033[96m'
             RESET = '\033[0m'
+
+            def on_done(description):
+                print(f"{CYAN}✓{RESET} {description}")
             
-            for i in range(40):  # Show animation for ~4 seconds
-                frame = animation_frames[i % len(animation_frames)]
-                # Clear the line and show the new frame
-                sys.stdout.write(f"\r{CYAN}{frame}{RESET} {loading_text}" + "." * (i % 4))
-                sys.stdout.flush()
-                time.sleep(0.1)
-            print("\nTerminal Ready!")
+            if started:
+                # The tasks already ran (or were running) under the rich display
+                print("Terminal Ready!")
+                return
+            print("Starting Terminal...")
+            started = True
+            run_all(on_done)
+            print("Terminal Ready!")
     
     except Exception:
         # Absolute fallback - just print a message
         print("Starting terminal...")
 
-def get_prompt():
-    """Create a customized prompt"""
-    # Load prompt configuration
-    prompt_config = load_prompt_config()
-    
-    # Get current time
-    current_time = datetime.now().strftime(prompt_config['time_format'])
-    
+def get_prompt_username() -> str:
+    """Name of the user running the terminal, for the prompt"""
     try:
-        username = os.getlogin()
+        return os.getlogin()
     except:
         try:
             import getpass
-            username = getpass.getuser()
+            return getpass.getuser()
         except:
-            username = "user"
-            
-    try:
-        current_dir = os.path.basename(os.getcwd())
-    except:
-        current_dir = "~"
-    
-    # Parse the prompt format and replace placeholders
-    format_str = prompt_config['format']
-    format_str = format_str.replace('%time%', current_time)
-    format_str = format_str.replace('%username%', username)
-    format_str = format_str.replace('%directory%', current_dir)
-    format_str = format_str.replace('%date%', datetime.now().strftime('%Y-%m-%d'))
-    
+            return "user"
+
+def get_prompt_hostname() -> str:
+    """Host name for the prompt"""
     try:
-        hostname = platform.node()
+        return platform.node()
     except:
-        hostname = "localhost"
-    format_str = format_str.replace('%hostname%', hostname)
-    
-    # Parse the style tags and create formatted text
-    parts = []
-    current_text = ''
-    current_color = ''  # Start with empty string instead of None
-    i = 0
-    
-    while i < len(format_str):
-        # Check for style tags
-        if format_str[i:i+8] == '<purple>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:magenta'
-            current_text = ''
-            i += 8
-        elif format_str[i:i+7] == '<green>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:green'
-            current_text = ''
-            i += 7
-        elif format_str[i:i+6] == '<cyan>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:cyan'
-            current_text = ''
-            i += 6
-        elif format_str[i:i+5] == '<red>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:red'
-            current_text = ''
-            i += 5
-        elif format_str[i:i+6] == '<blue>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:blue'
-            current_text = ''
-            i += 6
-        elif format_str[i:i+8] == '<yellow>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:yellow'
-            current_text = ''
-            i += 8
-        elif format_str[i:i+7] == '<white>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:white'
-            current_text = ''
-            i += 7
-        elif format_str[i:i+7] == '<black>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = 'class:black'
-            current_text = ''
-            i += 7
-        elif format_str[i:i+3] == '<c>':
-            if current_text:
-                parts.append((current_color, current_text))
-            current_color = ''  # Empty string instead of None
-            current_text = ''
-            i += 3
-        elif format_str[i:i+3] == '<n>':
-            if current_text:
-                parts.append((current_color, current_text))
-            parts.append(('', '\n'))  # Use empty string instead of None
-            current_color = ''  # Empty string instead of None
-            current_text = ''
-            i += 3
-        else:
-            current_text += format_str[i]
-            i += 1
-    
-    # Add any remaining text
-    if current_text:
-        parts.append((current_color, current_text))
-    
-    return FormattedText(parts)
+        return "localhost"
+
+class PromptTemplate:
+    """A prompt format compiled once into styled segments; only dynamic placeholders are evaluated per prompt"""
+    # Color tags and the prompt_toolkit style each one switches to
+    TAGS = {
+        '<purple>': 'class:magenta',
+        '<green>': 'class:green',
+        '<cyan>': 'class:cyan',
+        '<red>': 'class:red',
+        '<blue>': 'class:blue',
+        '<yellow>': 'class:yellow',
+        '<white>': 'class:white',
+        '<black>': 'class:black',
+        '<c>': ''
+    }
+    # Placeholders whose value can't change during the session are filled in when compiling
+    STATIC_PLACEHOLDERS = {
+        '%username%': get_prompt_username,
+        '%hostname%': get_prompt_hostname
+    }
+    DYNAMIC_PLACEHOLDERS = ('%time%', '%directory%', '%date%', '%last_duration%')
+    TOKEN_PATTERN = re.compile('|'.join(re.escape(token) for token in
+                                        list(TAGS) + ['<n>'] + list(STATIC_PLACEHOLDERS) + list(DYNAMIC_PLACEHOLDERS)))
+    _static_values: Dict[str, str] = {}
+
+    def __init__(self, format_str: str, time_format: str = '%H:%M:%S'):
+        self.format_str = format_str
+        self.time_format = time_format
+        # (style, text, placeholder): placeholder is None for precomputed text
+        self.segments: List[Tuple[str, str, Optional[str]]] = self._compile(format_str)
+
+    @classmethod
+    def static_value(cls, placeholder: str) -> str:
+        if placeholder not in cls._static_values:
+            cls._static_values[placeholder] = cls.STATIC_PLACEHOLDERS[placeholder]()
+        return cls._static_values[placeholder]
+
+    def _compile(self, format_str: str) -> List[Tuple[str, str, Optional[str]]]:
+        segments = []
+        color = ''
+
+        def add_text(text):
+            if not text:
+                return
+            # Merge with the previous static segment of the same style
+            if (segments and segments[-1][2] is None and segments[-1][0] == color
+                    and '\n' not in (text, segments[-1][1])):
+                segments[-1] = (color, segments[-1][1] + text, None)
+            else:
+                segments.append((color, text, None))
+        
+        position = 0
+        for match in self.TOKEN_PATTERN.finditer(format_str):
+            add_text(format_str[position:match.start()])
+            position = match.end()
+            token = match.group()
+            if token in self.TAGS:
+                color = self.TAGS[token]
+            elif token == '<n>':
+                # A line break always resets the color
+                color = ''
+                add_text('\n')
+            elif token in self.STATIC_PLACEHOLDERS:
+                add_text(self.static_value(token))
+            else:
+                segments.append((color, '', token))
+        add_text(format_str[position:])
+        return segments
+
+    def _dynamic_value(self, placeholder: str) -> str:
+        if placeholder == '%time%':
+            return datetime.now().strftime(self.time_format)
+        if placeholder == '%directory%':
+            try:
+                return os.path.basename(os.getcwd())
+            except:
+                return "~"
+        if placeholder == '%date%':
+            return datetime.now().strftime('%Y-%m-%d')
+        return format_duration(last_command_stats.get('wall_seconds'))
+
+    def render(self) -> FormattedText:
+        """Fill in the dynamic placeholders and return the prompt"""
+        parts = []
+        for color, text, placeholder in self.segments:
+            if placeholder is not None:
+                text = self._dynamic_value(placeholder)
+                if not text:
+                    continue
+            # Keep runs of one style in a single fragment
+            if parts and parts[-1][0] == color and parts[-1][1] != '\n' and text != '\n':
+                parts[-1] = (color, parts[-1][1] + text)
+            else:
+                parts.append((color, text))
+        return FormattedText(parts)
+
+class PromptTemplateCache:
+    """The compiled prompt for the current prompt configuration, recompiled when the configuration changes"""
+
+    def __init__(self):
+        self._template = None
+        self._version = None
+
+    def get(self) -> PromptTemplate:
+        version = config_manager.version('prompt')
+        if self._template is None or version != self._version:
+            prompt_config = load_prompt_config()
+            self._template = PromptTemplate(prompt_config['format'], prompt_config['time_format'])
+            self._version = version
+        return self._template
+
+prompt_template_cache = PromptTemplateCache()
+
+def get_prompt():
+    """Create a customized prompt"""
+    return prompt_template_cache.get().render()
 
 def show_command_execution_animation(command):
     """Show an animation while a command is executing"""
@@ -692,6 +1615,1045 @@ def show_command_execution_animation(command):
         # If animation fails, do nothing - the command will still execute
         pass
 
+class OutputWriter:
+    """Single terminal writer for command output and the execution spinner, with batched flushes"""
+    SPINNER_FRAMES = '⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏'
+
+    def __init__(self, stream=None, flush_interval: float = 0.05, flush_size: int = 256 * 1024,
+                 spinner_delay: float = 0.3):
+        self.stream = stream or sys.stdout.buffer
+        # Buffered output is written once it is flush_interval seconds old or flush_size bytes big
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # The spinner only appears after the output has been quiet for spinner_delay seconds
+        self.spinner_delay = spinner_delay
+        self.spinner_text = None
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._spinner_visible = False
+        self._spinner_frame = 0
+        self._at_line_start = True
+        self._last_output = 0.0
+        self._started = 0.0
+        self._finished = None
+        self._bytes = 0
+        self._lines = 0
+
+    def start(self, spinner_text: Optional[str] = None):
+        """Start the flush/spinner thread and reset the throughput counters"""
+        self.spinner_text = spinner_text if self.stream.isatty() else None
+        self._started = self._last_output = time.monotonic()
+        self._finished = None
+        self._bytes = self._lines = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='output-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes):
+        """Queue output; large bursts are flushed immediately"""
+        with self._condition:
+            self._buffer += data
+            self._bytes += len(data)
+            self._lines += data.count(b'\n')
+            self._last_output = time.monotonic()
+            if len(self._buffer) >= self.flush_size:
+                self._flush()
+
+    def write_file(self, fd: int, chunk_size: int = 1024 * 1024):
+        """Copy an open file to the output, with sendfile() when the output is not a terminal"""
+        with self._condition:
+            self._flush()
+            self._last_output = time.monotonic()
+            out_fd = self.stream.fileno()
+            if hasattr(os, 'sendfile') and not self.stream.isatty():
+                # Zero-copy path for redirected output; line counts are not available here
+                offset = 0
+                try:
+                    while True:
+                        sent = os.sendfile(out_fd, fd, offset, chunk_size)
+                        if not sent:
+                            return
+                        offset += sent
+                        self._bytes += sent
+                except OSError:
+                    if offset:
+                        raise
+                    # Not supported for this pair of files, copy instead
+        for data in iter(lambda: os.read(fd, chunk_size), b''):
+            self.write(data)
+
+    def _flush(self):
+        """Write the buffered output in one go (caller holds the lock)"""
+        if not self._buffer:
+            return
+        if self._spinner_visible:
+            # Erase the spinner line before the output takes its place
+            self.stream.write(b'\r\033[K')
+            self._spinner_visible = False
+        self.stream.write(self._buffer)
+        self.stream.flush()
+        self._at_line_start = self._buffer.endswith(b'\n')
+        self._buffer.clear()
+
+    def _draw_spinner(self):
+        """Draw the next spinner frame on its own line (caller holds the lock)"""
+        frame = self.SPINNER_FRAMES[self._spinner_frame % len(self.SPINNER_FRAMES)]
+        self._spinner_frame += 1
+        self.stream.write(f"\r\033[36m{frame} {self.spinner_text}\033[0m\033[K".encode('utf-8', 'replace'))
+        self.stream.flush()
+        self._spinner_visible = True
+
+    def _run(self):
+        """Flush on a timer and animate the spinner while the command is quiet"""
+        with self._condition:
+            while self._running:
+                self._condition.wait(self.flush_interval)
+                if self._buffer:
+                    self._flush()
+                elif (self.spinner_text and self._at_line_start
+                        and time.monotonic() - self._last_output >= self.spinner_delay):
+                    # Never draw over a partial line such as an input prompt
+                    self._draw_spinner()
+
+    def close(self):
+        """Stop the thread, flush everything and remove the spinner"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+        with self._condition:
+            self._flush()
+            if self._spinner_visible:
+                self.stream.write(b'\r\033[K')
+                self.stream.flush()
+                self._spinner_visible = False
+            self._finished = time.monotonic()
+
+    def stats(self) -> dict:
+        """Return output throughput counters for the last run"""
+        elapsed = max((self._finished or time.monotonic()) - self._started, 1e-9)
+        return {
+            'output_bytes': self._bytes,
+            'output_lines': self._lines,
+            'output_seconds': elapsed,
+            'lines_per_second': self._lines / elapsed
+        }
+
+# Metrics for the most recently executed command, shown by the `stats` command
+last_command_stats: Dict[str, float] = {}
+
+def rusage_max_rss_kb(usage) -> int:
+    """ru_maxrss in kilobytes (it is in kilobytes on Linux but in bytes on macOS)"""
+    return usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+
+def usage_from_rusage(usage) -> dict:
+    """Convert a struct_rusage into the fields recorded per command"""
+    max_rss = rusage_max_rss_kb(usage)
+    fields = {
+        'user_seconds': round(usage.ru_utime, 6),
+        'sys_seconds': round(usage.ru_stime, 6),
+        'max_rss_kb': max_rss
+    }
+    if RESOURCE_AVAILABLE:
+        # A forked child starts as a copy of this interpreter, and ru_maxrss covers the time
+        # before exec() too: a peak up to our own peak may be ours, not the command's
+        baseline = rusage_max_rss_kb(resource.getrusage(resource.RUSAGE_SELF))
+        if max_rss <= baseline:
+            fields['max_rss_kb'] = None
+            fields['max_rss_at_most_kb'] = baseline
+    return fields
+
+def reap_process(process, block: bool = True):
+    """Wait for a child with wait4() so its resource usage is captured
+
+    Returns (returncode, usage) - usage is None where wait4() isn't available -
+    or None if block is False and the child is still running.
+    """
+    if process.returncode is not None:
+        return process.returncode, None
+    if not hasattr(os, 'wait4'):
+        returncode = process.wait() if block else process.poll()
+        return None if returncode is None else (returncode, None)
+    try:
+        pid, status, usage = os.wait4(process.pid, 0 if block else os.WNOHANG)
+    except ChildProcessError:
+        # Already reaped elsewhere
+        return process.wait(), None
+    if pid == 0:
+        return None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage_from_rusage(usage)
+
+class CommandLog:
+    """Append-only JSONL log of executed commands and what they cost"""
+
+    def __init__(self, log_file: Optional[str] = None, max_size: int = 5 * 1024 * 1024):
+        self.log_file = log_file or os.path.join(os.path.expanduser('~'), '.terminal_command_log.jsonl')
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict):
+        """Append one entry, rotating the log to <file>.1 once it grows past max_size"""
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            try:
+                if os.path.exists(self.log_file) and os.path.getsize(self.log_file) > self.max_size:
+                    os.replace(self.log_file, self.log_file + '.1')
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except Exception:
+                pass
+
+command_log = CommandLog()
+
+def record_command_usage(command: str, mode: str, returncode: Optional[int], wall_seconds: float,
+                         usage: Optional[dict] = None, output: Optional[dict] = None,
+                         update_last: bool = True):
+    """Record what a command cost, for `stats`, %last_duration% and the command log"""
+    try:
+        cwd = os.getcwd()
+    except OSError:
+        cwd = None
+    entry = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'command': command,
+        'cwd': cwd,
+        'mode': mode,
+        'returncode': returncode,
+        'wall_seconds': round(wall_seconds, 6),
+        'user_seconds': None,
+        'sys_seconds': None,
+        'max_rss_kb': None,
+        'max_rss_at_most_kb': None,
+        'output_bytes': (output or {}).get('output_bytes', 0),
+        'output_lines': (output or {}).get('output_lines', 0)
+    }
+    if usage:
+        entry.update(usage)
+    if update_last:
+        last_command_stats.clear()
+        last_command_stats.update(output or {})
+        last_command_stats.update(entry)
+    command_log.append(entry)
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format a duration compactly: 35ms, 4.2s, 3m07s"""
+    if seconds is None:
+        return ''
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+def stream_process_output(process, on_output, chunk_size: int = 65536):
+    """Drain a child's stdout and stderr concurrently, calling on_output(stream, data) in arrival order"""
+    pipes = {process.stdout: 'stdout', process.stderr: 'stderr'}
+    pipes = {pipe: name for pipe, name in pipes.items() if pipe is not None}
+    
+    if platform.system() == 'Windows':
+        # Pipes can't be selected on Windows: one reader thread per pipe feeding a queue
+        chunks = queue.Queue()
+        
+        def reader(pipe, name):
+            try:
+                # Unbuffered pipes return whatever is available, up to chunk_size
+                for data in iter(lambda: pipe.read(chunk_size), b''):
+                    chunks.put((name, data))
+            finally:
+                chunks.put((name, None))
+        
+        for pipe, name in pipes.items():
+            threading.Thread(target=reader, args=(pipe, name), daemon=True).start()
+        open_pipes = len(pipes)
+        while open_pipes:
+            name, data = chunks.get()
+            if data is None:
+                open_pipes -= 1
+            else:
+                on_output(name, data)
+        return
+    
+    with selectors.DefaultSelector() as selector:
+        for pipe, name in pipes.items():
+            selector.register(pipe, selectors.EVENT_READ, name)
+        while selector.get_map():
+            for key, _ in selector.select():
+                # Read whatever is available, up to chunk_size, without waiting for a full line
+                data = os.read(key.fd, chunk_size)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                on_output(key.data, data)
+
+# Programs that need a real terminal (full screen UIs, pagers, password prompts)
+TTY_COMMANDS = {
+    'top', 'htop', 'btop', 'atop', 'vim', 'vi', 'nvim', 'nano', 'emacs', 'less', 'more', 'most',
+    'man', 'ssh', 'telnet', 'ftp', 'sftp', 'mysql', 'psql', 'sqlite3', 'tmux', 'screen', 'watch', 'sudo',
+    'su', 'passwd', 'tig', 'ranger', 'mc', 'nmtui', 'alsamixer', 'iftop', 'nethogs'
+}
+
+# REPLs and shells are interactive only when started without arguments (`python3 script.py` is not)
+REPL_COMMANDS = {'python', 'python3', 'ipython', 'node', 'irb', 'bash', 'zsh', 'fish', 'sh'}
+
+def needs_tty(command: str) -> bool:
+    """Check whether a command should run on a pseudo-terminal"""
+    try:
+        args = shlex.split(command)
+        program = os.path.basename(args[0]).lower()
+    except (ValueError, IndexError):
+        return False
+    if program in REPL_COMMANDS:
+        return len(args) == 1
+    return program in TTY_COMMANDS
+
+def copy_window_size(source_fd: int, target_fd: int):
+    """Copy the terminal window size from one tty to another (the child gets SIGWINCH)"""
+    try:
+        size = fcntl.ioctl(source_fd, termios.TIOCGWINSZ, b'\0' * 8)
+        fcntl.ioctl(target_fd, termios.TIOCSWINSZ, size)
+    except OSError:
+        pass
+
+def run_in_pty(command: str, chunk_size: int = 65536) -> Tuple[int, Optional[dict], dict]:
+    """Run a command on a pseudo-terminal, passing raw bytes both ways; returns (returncode, usage, stats)"""
+    stdin_fd = sys.stdin.fileno()
+    stdout = sys.stdout.buffer
+    stdout.flush()
+    interactive = os.isatty(stdin_fd)
+    
+    master_fd, slave_fd = pty.openpty()
+    if os.isatty(stdout.fileno()):
+        copy_window_size(stdout.fileno(), master_fd)
+    
+    def make_controlling_tty():
+        # Runs in the child after setsid(): the pty becomes its controlling terminal,
+        # so Ctrl+C, job control and /dev/tty work as in a normal shell
+        fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+    
+    try:
+        process = subprocess.Popen(command,
+                                   shell=True,
+                                   stdin=slave_fd,
+                                   stdout=slave_fd,
+                                   stderr=slave_fd,
+                                   start_new_session=True,
+                                   preexec_fn=make_controlling_tty)
+    except Exception:
+        os.close(master_fd)
+        raise
+    finally:
+        os.close(slave_fd)
+    
+    # Forward window size changes while the command runs (signals only work in the main thread)
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread() and os.isatty(stdout.fileno()):
+        previous_handler = signal.signal(signal.SIGWINCH,
+                                         lambda signum, frame: copy_window_size(stdout.fileno(), master_fd))
+    
+    # Raw mode: keystrokes (including Ctrl+C) go straight to the child's terminal
+    saved_mode = None
+    if interactive:
+        saved_mode = termios.tcgetattr(stdin_fd)
+        tty.setraw(stdin_fd)
+    
+    started = time.monotonic()
+    output_bytes = output_lines = 0
+    result = None
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(master_fd, selectors.EVENT_READ, 'output')
+            if interactive:
+                selector.register(stdin_fd, selectors.EVENT_READ, 'input')
+            while True:
+                events = selector.select(0.1)
+                if not events:
+                    result = reap_process(process, block=False)
+                    if result is not None:
+                        # The child is gone; only background processes may still hold the pty open
+                        break
+                done = False
+                for key, _ in events:
+                    if key.data == 'input':
+                        data = os.read(stdin_fd, chunk_size)
+                        if data:
+                            os.write(master_fd, data)
+                        else:
+                            selector.unregister(stdin_fd)
+                        continue
+                    try:
+                        data = os.read(master_fd, chunk_size)
+                    except OSError:
+                        # Linux reports EIO once the slave side is closed
+                        data = b''
+                    if not data:
+                        done = True
+                        break
+                    output_bytes += len(data)
+                    output_lines += data.count(b'\n')
+                    stdout.write(data)
+                    stdout.flush()
+                if done:
+                    break
+        if result is None:
+            result = reap_process(process)
+    finally:
+        if saved_mode is not None:
+            termios.tcsetattr(stdin_fd, termios.TCSAFLUSH, saved_mode)
+        if previous_handler is not None:
+            signal.signal(signal.SIGWINCH, previous_handler)
+        os.close(master_fd)
+    
+    returncode, usage = result
+    elapsed = max(time.monotonic() - started, 1e-9)
+    return returncode, usage, {
+        'output_bytes': output_bytes,
+        'output_lines': output_lines,
+        'output_seconds': elapsed,
+        'lines_per_second': output_lines / elapsed
+    }
+
+class ShellCoprocess:
+    """Long-lived shell that runs commands over a pipe, so each command skips the shell startup"""
+    # Shells that understand the POSIX syntax used to frame each command
+    SHELLS = ('sh', 'bash', 'dash', 'zsh', 'ksh', 'mksh', 'ash')
+
+    def __init__(self, shell: Optional[str] = None):
+        if shell is None:
+            shell = get_system_shell()
+            if os.path.basename(shell) not in self.SHELLS:
+                shell = '/bin/sh'
+        self.shell = shell
+        self.process = None
+        self.shell_cwd = None
+        self.last_usage = None
+        self._cpu_times = None
+        self._marker = b''
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """Spawn a fresh shell with a new random sentinel"""
+        # \036 (record separator) plus a per-shell token keeps the sentinel out of normal output
+        token = os.urandom(8).hex()
+        self._marker = b'\036' + token.encode('ascii')
+        # The stdout sentinel carries the exit code, the shell's `times` (CPU used by the shell
+        # and its children so far) and $PWD; a second sentinel marks the end of stderr
+        self._framing = (f"__terminal_status=$?; printf '\\036{token}:%s:' \"$__terminal_status\"; times; "
+                         f"printf '\\037%s\\036\\n' \"$PWD\"; printf '\\036{token}\\036\\n' >&2\n")
+        self._cpu_times = (0.0, 0.0)
+        self.shell_cwd = os.getcwd()
+        self.process = subprocess.Popen([self.shell],
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE,
+                                        bufsize=0)
+
+    def stop(self):
+        """Kill the shell; the next command starts a new one"""
+        process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def _send(self, command: str):
+        """Write one framed command to the shell"""
+        script = ''
+        cwd = os.getcwd()
+        if cwd != self.shell_cwd:
+            # Keep the shell in step with `cd` handled by the terminal itself
+            script += f'cd -- {shlex.quote(cwd)} 2>/dev/null\n'
+        # Commands must not read the command stream, so their stdin is the terminal (or nothing)
+        try:
+            stdin_source = '/dev/tty' if os.isatty(sys.stdin.fileno()) else '/dev/null'
+        except (AttributeError, ValueError, OSError):
+            stdin_source = '/dev/null'
+        script += f'eval {shlex.quote(command)} <{stdin_source}\n' + self._framing
+        os.write(self.process.stdin.fileno(), script.encode('utf-8', 'surrogateescape'))
+
+    def run(self, command: str, on_output, chunk_size: int = 65536) -> int:
+        """Run a command, calling on_output(stream, data) as output arrives; returns the exit code"""
+        with self._lock:
+            # Only set once the command's CPU times are read; a command that ends the shell has none
+            self.last_usage = None
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+            try:
+                self._send(command)
+            except BrokenPipeError:
+                # The shell died since the last command; start over once
+                self.stop()
+                self._start()
+                self._send(command)
+            try:
+                return self._collect(on_output, chunk_size)
+            except BaseException:
+                # Ctrl+C or a failure mid-command leaves the shell in an unknown state
+                self.stop()
+                raise
+
+    def _collect(self, on_output, chunk_size: int) -> int:
+        """Forward output until both sentinels arrive, then sync the working directory"""
+        markers = {'stdout': self._marker + b':', 'stderr': self._marker + b'\036\n'}
+        pending = {'stdout': b'', 'stderr': b''}
+        status = None
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.process.stdout, selectors.EVENT_READ, 'stdout')
+            selector.register(self.process.stderr, selectors.EVENT_READ, 'stderr')
+            while selector.get_map():
+                for key, _ in selector.select():
+                    name = key.data
+                    data = os.read(key.fd, chunk_size)
+                    if not data:
+                        # The command ended the shell itself (exit, exec, syntax error, ...)
+                        for stream, rest in pending.items():
+                            if rest:
+                                on_output(stream, rest)
+                        returncode = self.process.wait()
+                        self.process = None
+                        return returncode
+                    buffer = pending[name] + data
+                    marker = markers[name]
+                    index = buffer.find(marker)
+                    if index < 0:
+                        # Hold back a trailing partial sentinel split across reads
+                        keep = 0
+                        if b'\036' in buffer[-len(marker):]:
+                            for size in range(min(len(marker), len(buffer)), 0, -1):
+                                if buffer.endswith(marker[:size]):
+                                    keep = size
+                                    break
+                        if len(buffer) > keep:
+                            on_output(name, buffer[:len(buffer) - keep])
+                        pending[name] = buffer[len(buffer) - keep:]
+                        continue
+                    if index:
+                        on_output(name, buffer[:index])
+                    if name == 'stdout':
+                        end = buffer.find(b'\036\n', index + len(marker))
+                        if end < 0:
+                            pending[name] = buffer[index:]
+                            continue
+                        status = buffer[index + len(marker):end]
+                    pending[name] = b''
+                    selector.unregister(key.fileobj)
+        
+        code, _, rest = status.partition(b':')
+        times, _, cwd = rest.partition(b'\037')
+        self.last_usage = self._usage_since_last(times)
+        self.shell_cwd = os.fsdecode(cwd)
+        if self.shell_cwd != os.getcwd():
+            # `cd` inside a compound command carries over to the terminal
+            try:
+                os.chdir(self.shell_cwd)
+            except OSError:
+                pass
+        return int(code)
+
+    def _usage_since_last(self, times: bytes) -> Optional[dict]:
+        """Turn the cumulative `times` output into CPU used by the last command"""
+        # "0m0.01s 0m0.00s" for the shell itself, then the same for its children
+        values = [int(minutes) * 60 + float(seconds)
+                  for minutes, seconds in re.findall(rb'(\d+)m([\d.]+)s', times)]
+        if len(values) < 4:
+            return None
+        cpu_times = (values[0] + values[2], values[1] + values[3])
+        previous, self._cpu_times = self._cpu_times, cpu_times
+        # Max RSS isn't available for commands run by the shell
+        return {
+            'user_seconds': round(max(cpu_times[0] - previous[0], 0.0), 6),
+            'sys_seconds': round(max(cpu_times[1] - previous[1], 0.0), 6)
+        }
+
+# Commands run through one warm shell on POSIX systems; started on first use
+shell_coprocess = ShellCoprocess() if platform.system() != 'Windows' else None
+
+# Characters that need a real shell (expansion, quoting escapes, redirection, globbing, ...)
+SHELL_SYNTAX = set('|&;<>()$`\\*?[]{}~#!\n')
+
+# Sort key for `ls` in the user's locale: (key function or None,) once set up
+_collation = None
+
+def setup_collation():
+    """Apply the user's collation locale once, at startup, before other threads run"""
+    global _collation
+    import locale
+    try:
+        locale.setlocale(locale.LC_COLLATE, '')
+        _collation = (locale.strxfrm,)
+    except (locale.Error, ValueError):
+        _collation = (None,)
+
+def _collation_key():
+    """Return the sort key `ls` uses for names in the current locale"""
+    if _collation is None:
+        setup_collation()
+    return _collation[0]
+
+def run_fast_builtin(command: str, on_output, writer: OutputWriter) -> Optional[int]:
+    """Run pwd, echo, ls, cat or clear in-process; returns None when the real command is needed"""
+    if SHELL_SYNTAX.intersection(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv:
+        return None
+    name, args = argv[0], argv[1:]
+    
+    if name == 'pwd' and not args:
+        on_output('stdout', os.fsencode(os.getcwd()) + b'\n')
+        return 0
+    
+    if name == 'echo':
+        newline = b'\n'
+        if args and args[0] == '-n':
+            newline = b''
+            args = args[1:]
+        # Other options (-e, -E, combined flags) differ between shells' echo builtins
+        if args and args[0].startswith('-') and args[0] != '-':
+            return None
+        on_output('stdout', os.fsencode(' '.join(args)) + newline)
+        return 0
+    
+    if name == 'clear' and not args:
+        if not sys.stdout.isatty() or os.environ.get('TERM', 'dumb') == 'dumb':
+            return None
+        on_output('stdout', b'\033[H\033[2J\033[3J')
+        return 0
+    
+    if name == 'cat' and args:
+        if any(arg.startswith('-') for arg in args):
+            return None
+        returncode = 0
+        for path in args:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError as e:
+                on_output('stderr', os.fsencode(f"cat: {path}: {e.strerror}\n"))
+                returncode = 1
+                continue
+            try:
+                writer.write_file(fd)
+            except IsADirectoryError:
+                on_output('stderr', os.fsencode(f"cat: {path}: Is a directory\n"))
+                returncode = 1
+            finally:
+                os.close(fd)
+        return returncode
+    
+    if name == 'ls' and len(args) <= 1:
+        # Output goes to a pipe, where ls prints one name per line, sorted by the locale
+        if args and args[0].startswith('-'):
+            return None
+        path = args[0] if args else '.'
+        try:
+            if not os.path.isdir(path):
+                if not os.path.lexists(path):
+                    return None
+                on_output('stdout', os.fsencode(path) + b'\n')
+                return 0
+            with os.scandir(path) as entries:
+                names = [entry.name for entry in entries if not entry.name.startswith('.')]
+        except OSError:
+            return None
+        sort_key = _collation_key()
+        try:
+            names.sort(key=sort_key)
+        except (TypeError, ValueError, UnicodeError):
+            return None
+        if names:
+            on_output('stdout', os.fsencode('\n'.join(names)) + b'\n')
+        return 0
+    
+    return None
+
+def spawn_detached(command: str):
+    """Start a command in its own process group with piped output and no stdin"""
+    if platform.system() == 'Windows':
+        shell = get_system_shell()
+        flag = '-Command' if shell == 'powershell.exe' else '/c'
+        return subprocess.Popen([shell, flag, command],
+                                stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                bufsize=0,
+                                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+    # Own session: Ctrl+C at the prompt doesn't reach it, and signals go to the whole group
+    shell = shell_coprocess.shell if shell_coprocess is not None else '/bin/sh'
+    return subprocess.Popen([shell, '-c', command],
+                            stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            bufsize=0,
+                            start_new_session=True)
+
+def kill_process_group(process):
+    """Kill a process started by spawn_detached together with its children"""
+    try:
+        if platform.system() == 'Windows':
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+class Job:
+    """A background command and the tail of its output"""
+
+    def __init__(self, job_id: int, command: str, process, max_output: int):
+        self.id = job_id
+        self.command = command
+        self.process = process
+        self.pid = process.pid
+        self.started = time.time()
+        self.started_monotonic = time.monotonic()
+        self.finished = None
+        self.returncode = None
+        self.stopped = False
+        self.notified = False
+        # Ring buffer of (stream, data) chunks; the oldest output is dropped past max_output bytes
+        self.output = collections.deque()
+        self.output_size = 0
+        self.dropped = 0
+        self.output_bytes = 0
+        self.output_lines = 0
+        self.max_output = max_output
+        self.listener = None
+        self.done = threading.Event()
+
+    @property
+    def status(self) -> str:
+        if self.returncode is None:
+            return 'Stopped' if self.stopped else 'Running'
+        if self.returncode == 0:
+            return 'Done'
+        if self.returncode < 0:
+            return f'Killed ({-self.returncode})'
+        return f'Exit {self.returncode}'
+
+    @property
+    def runtime(self) -> float:
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started_monotonic
+
+class JobTable:
+    """Background jobs started with `&`, managed with jobs/fg/bg/kill"""
+
+    def __init__(self, max_output: int = 1024 * 1024):
+        self.max_output = max_output
+        self.jobs: Dict[int, Job] = {}
+        self._lock = threading.Lock()
+
+    def launch(self, command: str) -> Job:
+        """Start a command in the background, capturing its output"""
+        process = spawn_detached(command)
+        with self._lock:
+            job_id = 1
+            while job_id in self.jobs:
+                job_id += 1
+            job = Job(job_id, command, process, self.max_output)
+            self.jobs[job_id] = job
+        threading.Thread(target=self._collect, args=(job,), name=f'job-{job_id}', daemon=True).start()
+        return job
+
+    def _collect(self, job: Job):
+        """Read a job's output into its ring buffer (or to the terminal while in the foreground)"""
+        def on_output(stream, data):
+            with self._lock:
+                job.output_bytes += len(data)
+                job.output_lines += data.count(b'\n')
+                if job.listener is not None:
+                    job.listener(stream, data)
+                    return
+                job.output.append((stream, data))
+                job.output_size += len(data)
+                while job.output_size > job.max_output and len(job.output) > 1:
+                    _, old = job.output.popleft()
+                    job.output_size -= len(old)
+                    job.dropped += len(old)
+        usage = None
+        try:
+            stream_process_output(job.process, on_output)
+        finally:
+            job.returncode, usage = reap_process(job.process)
+            job.finished = time.monotonic()
+            job.done.set()
+        record_command_usage(job.command, 'job', job.returncode, job.runtime, usage,
+                             {'output_bytes': job.output_bytes, 'output_lines': job.output_lines},
+                             update_last=False)
+
+    def get(self, spec: Optional[str] = None) -> Optional[Job]:
+        """Find a job by %n / n, or the most recent one"""
+        with self._lock:
+            if not spec:
+                return self.jobs[max(self.jobs)] if self.jobs else None
+            try:
+                return self.jobs.get(int(spec.lstrip('%')))
+            except ValueError:
+                return None
+
+    def list(self) -> List[Job]:
+        """Return the jobs ordered by job number"""
+        with self._lock:
+            return [self.jobs[job_id] for job_id in sorted(self.jobs)]
+
+    def take_output(self, job: Job, listener=None) -> list:
+        """Return and clear a job's buffered output, streaming anything later to listener"""
+        with self._lock:
+            chunks = list(job.output)
+            job.output.clear()
+            job.output_size = 0
+            job.listener = listener
+        return chunks
+
+    def signal(self, job: Job, signum=None) -> bool:
+        """Send a signal to a job's process group (Windows can only terminate)"""
+        if job.returncode is not None:
+            return False
+        if platform.system() == 'Windows':
+            job.process.terminate()
+            return True
+        try:
+            os.killpg(job.pid, signum)
+        except ProcessLookupError:
+            return False
+        if signum in (signal.SIGSTOP, signal.SIGTSTP, signal.SIGTTIN, signal.SIGTTOU):
+            job.stopped = True
+        elif signum == signal.SIGCONT:
+            job.stopped = False
+        return True
+
+    def finished_jobs(self) -> List[Job]:
+        """Return finished jobs that haven't been reported yet"""
+        with self._lock:
+            done = [job for job in self.jobs.values() if job.returncode is not None and not job.notified]
+            for job in done:
+                job.notified = True
+                # Jobs with unread output stay in the table for `fg`
+                if not job.output:
+                    del self.jobs[job.id]
+        return done
+
+    def forget(self, job: Job):
+        """Remove a job from the table"""
+        with self._lock:
+            self.jobs.pop(job.id, None)
+
+# Background jobs of this terminal session
+job_table = JobTable()
+
+def is_background_command(command: str) -> bool:
+    """Check for a trailing `&` (but not `&&`)"""
+    stripped = command.rstrip()
+    return stripped.endswith('&') and not stripped.endswith('&&')
+
+def report_finished_jobs():
+    """Print a line for each background job that finished since the last prompt"""
+    for job in job_table.finished_jobs():
+        color = 'green' if job.returncode == 0 else 'red'
+        note = " (output kept, use fg to see it)" if job.output else ""
+        console.print(f"[{color}][{job.id}]  {job.status:<12}[/{color}] {job.command}{note}")
+
+def foreground_job(job: Job):
+    """Replay a job's buffered output, then stream it live until the job ends"""
+    console.print(f"[cyan]{job.command}[/cyan]")
+    highlight_errors = sys.stdout.isatty()
+    writer = OutputWriter()
+    writer.start()
+
+    def show_output(stream, data):
+        if stream == 'stderr' and highlight_errors:
+            data = b'\033[31m' + data + b'\033[0m'
+        writer.write(data)
+
+    try:
+        if job.dropped:
+            show_output('stderr', f"[{format_size(job.dropped)} of earlier output dropped]\n".encode())
+        if job.stopped:
+            job_table.signal(job, signal.SIGCONT)
+        for stream, data in job_table.take_output(job, show_output):
+            show_output(stream, data)
+        job.done.wait()
+    except KeyboardInterrupt:
+        # Ctrl+C interrupts the job, like a foreground command
+        job_table.signal(job, signal.SIGINT if platform.system() != 'Windows' else None)
+    finally:
+        job_table.take_output(job, None)
+        writer.close()
+
+    if job.returncode is not None:
+        job_table.forget(job)
+        if job.returncode != 0:
+            console.print(f"[red]Command failed with return code {job.returncode}[/red]")
+
+def handle_job_command(command: str) -> bool:
+    """Handle jobs, fg, bg and kill %n; returns False for anything else"""
+    parts = command.split()
+    if not parts:
+        return False
+    name, args = parts[0], parts[1:]
+
+    if name == 'jobs' and not args:
+        jobs = job_table.list()
+        if not jobs:
+            console.print("[yellow]No background jobs.[/yellow]")
+        for job in jobs:
+            buffered = f", {format_size(job.output_size)} buffered" if job.output_size else ""
+            console.print(f"[cyan][{job.id}][/cyan]  {job.status:<12} pid {job.pid:<7} "
+                          f"{job.runtime:7.1f}s{buffered}  {job.command}")
+        return True
+
+    if name in ('fg', 'bg') and len(args) <= 1:
+        job = job_table.get(args[0] if args else None)
+        if job is None:
+            console.print(f"[red]{name}: no such job[/red]")
+        elif name == 'fg':
+            foreground_job(job)
+        elif platform.system() == 'Windows':
+            console.print("[red]bg: not supported on Windows[/red]")
+        elif job.stopped and job_table.signal(job, signal.SIGCONT):
+            console.print(f"[cyan][{job.id}][/cyan] {job.command} &")
+        else:
+            console.print(f"[yellow]bg: job {job.id} is not stopped[/yellow]")
+        return True
+
+    if name == 'kill' and args and args[-1].startswith('%') and len(args) <= 2:
+        signum = None
+        if platform.system() != 'Windows':
+            signum = signal.SIGTERM
+            if len(args) == 2:
+                # kill -9 %1, kill -STOP %1, kill -SIGCONT %1
+                value = args[0].lstrip('-').upper()
+                try:
+                    signum = int(value) if value.isdigit() else signal.Signals[
+                        value if value.startswith('SIG') else 'SIG' + value]
+                except (ValueError, KeyError):
+                    console.print(f"[red]kill: invalid signal {args[0]}[/red]")
+                    return True
+        job = job_table.get(args[-1])
+        if job is None or not job_table.signal(job, signum):
+            console.print(f"[red]kill: {args[-1]}: no such job[/red]")
+        return True
+
+    return False
+
+PAR_USAGE = "Usage: par [-jN] command {} ::: arg1 arg2 ..."
+
+def parse_par_command(command: str) -> Tuple[int, str, List[str]]:
+    """Split `par [-jN] template ::: args` into (jobs, template, expanded args)"""
+    head, separator, tail = command.partition(' ::: ')
+    if not separator:
+        raise ValueError(PAR_USAGE)
+    match = re.match(r'par(?:\s+(?:-j\s*|--jobs[=\s]+)(\d+))?\s+(.+)$', head.strip(), re.S)
+    if not match or not match.group(2).strip():
+        raise ValueError(PAR_USAGE)
+    jobs = int(match.group(1)) if match.group(1) else (os.cpu_count() or 1)
+    # The template keeps the user's own shell syntax; only {} is substituted
+    template = match.group(2).strip()
+    args = []
+    for arg in shlex.split(tail):
+        # Expand wildcards like the shell would; patterns without matches stay as they are
+        matches = sorted(glob.glob(arg)) if glob.has_magic(arg) else []
+        args.extend(matches or [arg])
+    return max(jobs, 1), template, args
+
+def run_parallel(command: str) -> str:
+    """Run a command template for each argument on a bounded worker pool"""
+    try:
+        jobs, template, args = parse_par_command(command)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    if not args:
+        return ""
+
+    def expand(arg):
+        quoted = shlex.quote(arg)
+        return template.replace('{}', quoted) if '{}' in template else f"{template} {quoted}"
+
+    running = set()
+    running_lock = threading.Lock()
+
+    def run_task(task_command):
+        started = time.monotonic()
+        process = spawn_detached(task_command)
+        with running_lock:
+            running.add(process)
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            with running_lock:
+                running.discard(process)
+        return process.returncode, stdout, stderr, time.monotonic() - started
+
+    # Output is grouped per task and printed as tasks finish; the spinner line shows progress
+    writer = OutputWriter(spinner_delay=0.1)
+    total = len(args)
+    done = 0
+    failures = []
+    highlight = sys.stdout.isatty()
+    writer.start(f"par: 0/{total} done, 0 failed ({min(jobs, total)} workers)")
+    executor = ThreadPoolExecutor(max_workers=min(jobs, total))
+    # CPU time of the tasks: everything reaped meanwhile counts (tasks are waited for directly)
+    started = time.monotonic()
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN) if RESOURCE_AVAILABLE else None
+    interrupted = False
+    try:
+        futures = {executor.submit(run_task, expand(arg)): (index, expand(arg))
+                   for index, arg in enumerate(args, 1)}
+        for future in as_completed(futures):
+            index, task_command = futures[future]
+            try:
+                returncode, stdout, stderr, elapsed = future.result()
+            except Exception as e:
+                returncode, stdout, stderr, elapsed = 127, b'', f"{e}\n".encode(), 0.0
+            done += 1
+            if returncode != 0:
+                failures.append((index, returncode))
+            header = f"── [{index}/{total}] {task_command} (exit {returncode}, {elapsed:.2f}s)\n"
+            if highlight:
+                color = '\033[32m' if returncode == 0 else '\033[31m'
+                header = f"{color}{header}\033[0m"
+            writer.write(header.encode('utf-8', 'replace') + stdout)
+            if stderr:
+                writer.write(b'\033[31m' + stderr + b'\033[0m' if highlight else stderr)
+            if stdout and not stdout.endswith(b'\n') or stderr and not stderr.endswith(b'\n'):
+                writer.write(b'\n')
+            writer.spinner_text = (f"par: {done}/{total} done, {len(failures)} failed "
+                                   f"({min(jobs, total - done)} running)") if writer.spinner_text else None
+    except KeyboardInterrupt:
+        # Stop queued tasks and kill the ones already running
+        executor.shutdown(wait=False, cancel_futures=True)
+        interrupted = True
+        with running_lock:
+            for process in list(running):
+                kill_process_group(process)
+        return f"Interrupted after {done} of {total} tasks"
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+        usage = None
+        if children_before is not None:
+            children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            usage = {
+                'user_seconds': round(children_after.ru_utime - children_before.ru_utime, 6),
+                'sys_seconds': round(children_after.ru_stime - children_before.ru_stime, 6)
+            }
+        # Like GNU parallel, the exit status is the number of failed tasks
+        returncode = 130 if interrupted else min(len(failures), 255)
+        record_command_usage(command, 'par', returncode, time.monotonic() - started, usage, writer.stats())
+
+    if failures:
+        codes = ', '.join(f"#{index}: {code}" for index, code in sorted(failures))
+        return f"{len(failures)} of {total} tasks failed (exit codes {codes})"
+    console.print(f"[green]par: {total} tasks succeeded[/green]")
+    return ""
+
 def execute_command(command):
     """Execute the command and show live output"""
     try:
@@ -700,121 +2662,222 @@ def execute_command(command):
         
         # Handle cd command separately
         if parts[0] == 'cd':
+            started = time.monotonic()
             if len(parts) > 1:
                 try:
                     os.chdir(parts[1])
                 except FileNotFoundError:
+                    record_command_usage(command, 'builtin', 1, time.monotonic() - started)
                     return f"Error: Directory '{parts[1]}' not found"
+                frecency_store.record('directory', os.getcwd())
+            record_command_usage(command, 'builtin', 0, time.monotonic() - started)
+            return ""
+        
+        # `pty <command>` forces pseudo-terminal mode for programs not in TTY_COMMANDS
+        use_pty = False
+        if parts[0] == 'pty' and len(parts) > 1:
+            command = command.split(None, 1)[1]
+            parts = parts[1:]
+            use_pty = True
+        
+        frecency_store.record('command', parts[0].lower())
+        
+        # `par` fans a command out over many arguments in parallel
+        if parts[0] == 'par':
+            return run_parallel(command)
+        
+        # `command &` runs in the background with its output captured
+        if is_background_command(command):
+            try:
+                job = job_table.launch(command.rstrip()[:-1].rstrip())
+            except Exception as e:
+                return f"Error: {str(e)}"
+            console.print(f"[cyan][{job.id}][/cyan] {job.pid}")
             return ""
         
-        # Start execution animation in a separate thread
-        try:
-            import threading
-            from rich.live import Live
-            from rich.panel import Panel
-            from rich.text import Text
-            from rich.spinner import Spinner
-            
-            stop_animation = False
-            
-            def animation_thread():
-                spinner = Spinner("dots2")
-                with console.status(f"[cyan]Executing: {command}[/cyan]", spinner="dots2") as status:
-                    while not stop_animation:
-                        time.sleep(0.1)
-            
-            # Only use animation for longer running commands
-            if not command.startswith(('ls', 'dir', 'echo', 'pwd', 'cd')):
-                animation = threading.Thread(target=animation_thread)
-                animation.daemon = True
-                animation.start()
-        except Exception:
-            # If animation fails, continue without it
-            animation = None
-            stop_animation = True
+        # Interactive and TTY-aware programs get a real terminal instead of pipes
+        if PTY_AVAILABLE and (use_pty or needs_tty(command)):
+            try:
+                returncode, usage, stats = run_in_pty(command)
+            except Exception as e:
+                return f"Error: {str(e)}"
+            record_command_usage(command, 'pty', returncode, stats['output_seconds'], usage, stats)
+            if returncode != 0:
+                return f"Command failed with return code {returncode}"
+            return ""
+        
+        # One writer owns the terminal while the command runs: batched output plus the spinner
+        # (only shown for longer running commands, once they go quiet)
+        writer = OutputWriter()
+        spinner_text = None if command.startswith(('ls', 'dir', 'echo', 'pwd', 'cd')) else f"Executing: {command}"
+        writer.start(spinner_text)
+        
+        # Show both streams live, in the order they arrive; stderr is highlighted in red
+        highlight_errors = sys.stdout.isatty()
+        
+        def show_output(stream, data):
+            if stream == 'stderr' and highlight_errors:
+                data = b'\033[31m' + data + b'\033[0m'
+            writer.write(data)
         
         # Execute other commands using the system shell
         shell = get_system_shell()
+        started = time.monotonic()
+        returncode = None
+        usage = None
+        mode = 'builtin'
         try:
-            # Use the system shell to execute the command
-            if platform.system() == 'Windows':
+            if shell_coprocess is not None and load_style_config().get('fast_builtins', True):
+                # Trivial builtins run in-process; anything they can't reproduce goes to the shell
+                returncode = run_fast_builtin(command, show_output, writer)
+            if returncode is not None:
+                # Handled in-process
+                pass
+            elif shell_coprocess is not None:
+                # Reuse the warm shell: no fork/exec of a new shell per command
+                mode = 'shell'
+                returncode = shell_coprocess.run(command, show_output)
+                usage = shell_coprocess.last_usage
+            else:
+                mode = 'shell'
+                # Use the system shell to execute the command (raw bytes, no per-line decoding)
                 if shell == 'powershell.exe':
-                    process = subprocess.Popen(['powershell.exe', '-Command', command], 
-                                            stdout=subprocess.PIPE,
-                                            stderr=subprocess.PIPE,
-                                            text=True,
-                                            bufsize=1,
-                                            universal_newlines=True)
+                    args = ['powershell.exe', '-Command', command]
                 else:
-                    process = subprocess.Popen(['cmd.exe', '/c', command], 
-                                            stdout=subprocess.PIPE,
-                                            stderr=subprocess.PIPE,
-                                            text=True,
-                                            bufsize=1,
-                                            universal_newlines=True)
-            else:
-                process = subprocess.Popen(command, 
-                                        shell=True,
+                    args = ['cmd.exe', '/c', command]
+                process = subprocess.Popen(args,
                                         stdout=subprocess.PIPE,
                                         stderr=subprocess.PIPE,
-                                        text=True,
-                                        bufsize=1,
-                                        universal_newlines=True)
-            
-            # Read output in real-time
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
-            
-            # Get any remaining error output
-            error = process.stderr.read()
-            
-            # Stop the animation
-            try:
-                if 'animation' in locals() and animation is not None:
-                    stop_animation = True
-                    animation.join(0.5)  # Wait for animation to stop
-            except:
-                pass
-                
-            if error:
-                return f"Error: {error}"
+                                        bufsize=0)
+                stream_process_output(process, show_output)
+                returncode, usage = reap_process(process)
+            writer.close()
             
             # Check return code
-            if process.returncode != 0:
-                return f"Command failed with return code {process.returncode}"
+            if returncode != 0:
+                return f"Command failed with return code {returncode}"
             return ""
             
         except FileNotFoundError:
-            # Stop animation if it's running
-            try:
-                if 'animation' in locals() and animation is not None:
-                    stop_animation = True
-                    animation.join(0.5)
-            except:
-                pass
-            
             return f"Error: Command '{parts[0]}' not found"
         except Exception as e:
-            # Stop animation if it's running
-            try:
-                if 'animation' in locals() and animation is not None:
-                    stop_animation = True
-                    animation.join(0.5)
-            except:
-                pass
-                
             return f"Error: {str(e)}"
+        finally:
+            # Make sure the spinner is gone and everything is flushed, whatever happened
+            writer.close()
+            record_command_usage(command, mode, returncode, time.monotonic() - started, usage, writer.stats())
             
     except Exception as e:
         return f"Error: {str(e)}"
 
+def show_command_stats():
+    """Show metrics for the most recently executed command"""
+    if not last_command_stats:
+        console.print("[yellow]No command has been executed yet.[/yellow]")
+        return
+    stats = last_command_stats
+    lines = [
+        f"Command: {stats['command']} ({stats['mode']})",
+        f"Exit code: {stats['returncode']}",
+        f"Wall time: {stats['wall_seconds']:.3f} s"
+    ]
+    if stats['user_seconds'] is not None:
+        lines.append(f"CPU time: {stats['user_seconds']:.3f} s user, {stats['sys_seconds']:.3f} s sys")
+    if stats['max_rss_kb'] is not None:
+        lines.append(f"Max RSS: {format_size(stats['max_rss_kb'] * 1024)}")
+    elif stats.get('max_rss_at_most_kb') is not None:
+        lines.append(f"Max RSS: at most {format_size(stats['max_rss_at_most_kb'] * 1024)} "
+                     f"(not measurable below the terminal's own size)")
+    lines.append(f"Output: {stats['output_lines']} lines, {format_size(stats['output_bytes'])}")
+    if 'lines_per_second' in stats:
+        lines.append(f"Throughput: {stats['lines_per_second']:,.0f} lines/s")
+    console.print(Panel("\n".join(lines), title="Last Command", border_style="blue"))
+
+class ImageStore:
+    """Banner images stored once in ~/.terminal_cache/images, named by the SHA-256 of their contents"""
+    # Configurations refer to stored images as "sha256:<hex digest>"
+    PREFIX = 'sha256:'
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(os.path.expanduser('~'), '.terminal_cache', 'images')
+
+    @classmethod
+    def is_reference(cls, value) -> bool:
+        return isinstance(value, str) and value.startswith(cls.PREFIX)
+
+    def path(self, reference: str) -> str:
+        """File holding the image a reference points to"""
+        digest = reference[len(self.PREFIX):]
+        if not re.fullmatch(r'[0-9a-f]{64}', digest):
+            raise ValueError(f"Invalid image reference: {reference}")
+        return os.path.join(self.directory, digest)
+
+    def put(self, data: bytes) -> str:
+        """Store image data (once per distinct content) and return its reference"""
+        reference = self.PREFIX + hashlib.sha256(data).hexdigest()
+        path = self.path(reference)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_file = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                set_replacement_mode(temp_file, path)
+                os.replace(temp_file, path)
+            except BaseException:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+                raise
+        return reference
+
+    def put_file(self, image_path: str) -> str:
+        """Store the contents of an image file and return its reference"""
+        with open(image_path, 'rb') as f:
+            return self.put(f.read())
+
+    def open(self, reference: str):
+        """Open a stored image with Pillow (pixel data is only read when it is used)"""
+        from PIL import Image
+        if not self.is_reference(reference):
+            # A base64 image from an older configuration that couldn't be moved into the store
+            import base64
+            import io
+            return Image.open(io.BytesIO(base64.b64decode(reference)))
+        return Image.open(self.path(reference))
+
+image_store = ImageStore()
+
+# Base64 images (by hash) that couldn't be moved into the image store, so they aren't retried on every load
+failed_image_migrations: Set[int] = set()
+
+def migrate_banner_image(image_data: str) -> Optional[str]:
+    """Move a base64 banner image from the configuration into the image store"""
+    import base64
+    
+    if hash(image_data) in failed_image_migrations:
+        return None
+    try:
+        reference = image_store.put(base64.b64decode(image_data))
+    except Exception:
+        failed_image_migrations.add(hash(image_data))
+        return None
+    config = config_manager.raw('banner')
+    if config.get('banner_image') == image_data:
+        config['banner_image'] = reference
+        config_manager.save('banner', config)
+    return reference
+
+# ASCII characters from dark to light, and the character for each gray level 0-255
+ASCII_ART_CHARS = ' .:-=+*#%@'
+ASCII_ART_TABLE = bytes(ord(ASCII_ART_CHARS[int(gray / 255 * (len(ASCII_ART_CHARS) - 1))]) for gray in range(256))
+
 def convert_image_to_ascii(image, width=40):
     """Convert image to ASCII art with transparent background handling"""
     try:
+        from PIL import Image
+        
         # Convert to RGBA if not already
         if image.mode != 'RGBA':
             image = image.convert('RGBA')
@@ -831,112 +2894,35 @@ def convert_image_to_ascii(image, width=40):
             # For older Pillow versions
             image = image.resize((width, height), Image.LANCZOS)
         
-        # ASCII characters from dark to light
-        ascii_chars = ' .:-=+*#%@'
+        # Grayscale (ITU-R 601-2 luma, like 0.299 R + 0.587 G + 0.114 B) and alpha for all pixels at once
+        gray, alpha = image.convert('LA').split()
         
-        # Convert to ASCII
-        ascii_art = []
-        for y in range(height):
-            line = ''
-            for x in range(width):
-                try:
-                    pixel = image.getpixel((x, y))
-                    # Check if pixel is transparent (handle both RGB and RGBA)
-                    if len(pixel) > 3 and pixel[3] < 128:  # Alpha channel < 128 means transparent
-                        line += ' '
-                    else:
-                        # Convert RGB to grayscale
-                        if len(pixel) >= 3:
-                            gray = 0.299 * pixel[0] + 0.587 * pixel[1] + 0.114 * pixel[2]
-                        else:
-                            gray = pixel[0]  # Already grayscale
-                        # Map to ASCII character
-                        char_index = int(gray / 255 * (len(ascii_chars) - 1))
-                        line += ascii_chars[char_index]
-                except Exception:
-                    line += ' '  # Use space for any errors
-            ascii_art.append(line)
+        # Transparent pixels (alpha < 128) become gray 0, which maps to a space
+        gray.paste(0, mask=alpha.point(lambda value: 255 if value < 128 else 0))
+        
+        # Map every gray level to its character with one table lookup per pixel
+        ascii_text = gray.tobytes().translate(ASCII_ART_TABLE).decode('ascii')
         
-        return '\n'.join(ascii_art)
+        return '\n'.join(ascii_text[y * width:(y + 1) * width] for y in range(height))
     except Exception as e:
         print(f"Error converting image: {e}")
         return None
 
-def show_banner():
-    """Display a professional banner"""
-    # Load banner configuration
-    banner_config = load_banner_config()
-    
+def render_banner_body(banner_config: dict) -> str:
+    """Build the banner text, with the configured image as ASCII art next to it"""
     # Get banner text
     banner_text = banner_config['banner_text']
     
-    # Get system information
-    system_info = {}
-    if banner_config['show_info']:
-        info_items = banner_config['info_items']
-        if info_items.get('OS', True):
-            system_info['OS'] = f"{platform.system()} {platform.release()}"
-        if info_items.get('Shell', True):
-            system_info['Shell'] = get_system_shell()
-        if info_items.get('Python', True):
-            system_info['Python'] = platform.python_version()
-        if info_items.get('Time', True):
-            system_info['Time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        if info_items.get('Directory', True):
-            try:
-                system_info['Directory'] = os.getcwd()
-            except:
-                system_info['Directory'] = "Unable to determine current directory"
-        if info_items.get('Username', True):
-            try:
-                system_info['Username'] = os.getlogin()
-            except:
-                try:
-                    import getpass
-                    system_info['Username'] = getpass.getuser()
-                except:
-                    system_info['Username'] = "Unknown"
-        if info_items.get('Hostname', True):
-            try:
-                system_info['Hostname'] = platform.node()
-            except:
-                system_info['Hostname'] = "Unknown"
-        if info_items.get('Memory', True):
-            try:
-                import psutil
-                memory = psutil.virtual_memory()
-                system_info['Memory'] = f"{memory.percent}% used ({memory.available / (1024*1024*1024):.1f} GB available)"
-            except:
-                system_info['Memory'] = "N/A"
-        if info_items.get('CPU', True):
-            try:
-                import psutil
-                cpu_percent = psutil.cpu_percent(interval=1)
-                system_info['CPU'] = f"{cpu_percent}% used"
-            except:
-                system_info['CPU'] = "N/A"
-    
-    # Add custom information
-    system_info.update(banner_config['custom_info'])
-    
-    # Create info text
-    info_text = "\n".join([f"{key}: {value}" for key, value in system_info.items()])
-    
     # Combine banner text and image
     banner_content = []
     
     if banner_config.get('banner_image'):
         try:
-            # Decode base64 image data
-            image_data = base64.b64decode(banner_config['banner_image'])
+            # Open the stored image (lazily: pixels are read during the conversion)
+            image = image_store.open(banner_config['banner_image'])
             
-            # Create a BytesIO object for the image data
-            image_io = io.BytesIO(image_data)
-            
-            # Try to open the image
+            # Try to convert the image
             try:
-                image = Image.open(image_io)
-                
                 # Convert to ASCII art
                 ascii_art = convert_image_to_ascii(image, banner_config.get('image_width', 40))
                 
@@ -970,32 +2956,155 @@ def show_banner():
                 print(f"Error processing image: {img_err}")
                 banner_content.append(banner_text)
         except Exception as e:
-            print(f"Error decoding image data: {e}")
+            print(f"Error loading banner image: {e}")
             banner_content.append(banner_text)
     else:
         banner_content.append(banner_text)
     
+    return "\n".join(banner_content)
+
+class BannerCache:
+    """Rendered banner bodies (text and image art) cached in ~/.terminal_cache/banners"""
+    # The configuration keys the body depends on; the info fields are filled in separately
+    BODY_KEYS = ('banner_text', 'banner_image', 'image_width')
+    # Bump when the rendering changes, so old entries are not reused
+    FORMAT_VERSION = 2
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 16):
+        self.directory = directory or os.path.join(os.path.expanduser('~'), '.terminal_cache', 'banners')
+        self.max_entries = max_entries
+
+    def key(self, banner_config: dict, width: int) -> str:
+        """Hash of what the body depends on: its configuration (image references carry the digest) and the width"""
+        data = {name: banner_config.get(name) for name in self.BODY_KEYS}
+        data.update(version=self.FORMAT_VERSION, width=width)
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def body(self, banner_config: dict, width: Optional[int] = None) -> str:
+        """The rendered banner body, from the cache if it was rendered before"""
+        if width is None:
+            width = console.width
+        cache_file = os.path.join(self.directory, self.key(banner_config, width) + '.json')
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)['body']
+        except Exception:
+            pass
+        
+        body = render_banner_body(banner_config)
+        # A failed image conversion falls back to the bare text; don't keep that
+        if banner_config.get('banner_image') and body == banner_config['banner_text']:
+            return body
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write_json_atomic(cache_file, {'body': body}, durable=False)
+            self._prune()
+        except Exception:
+            pass
+        return body
+
+    def _prune(self):
+        """Keep only the most recently written entries"""
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                   if name.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+banner_cache = BannerCache()
+
+def enabled_info_items(banner_config: dict) -> List[str]:
+    """Return the system information items the banner shows, in display order"""
+    if not banner_config['show_info']:
+        return []
+    info_items = banner_config['info_items']
+    return [name for name in SystemInfoProvider.ITEMS if info_items.get(name, True)]
+
+def render_banner(banner_config: Optional[dict] = None, system_info: Optional[dict] = None,
+                  body: Optional[str] = None):
+    """Build the banner: a rich Panel, or plain text if the panel can't be created"""
+    # Load banner configuration
+    if banner_config is None:
+        banner_config = load_banner_config()
+    
+    # Get system information (whatever is ready now; the rest shows a placeholder)
+    if system_info is None:
+        system_info = system_info_provider.values(system_info_provider.fetch(enabled_info_items(banner_config)))
+    system_info = dict(system_info)
+    
+    # Add custom information
+    system_info.update(banner_config['custom_info'])
+    
+    # Create info text
+    info_text = "\n".join([f"{key}: {value}" for key, value in system_info.items()])
+    
+    if body is None:
+        body = banner_cache.body(banner_config)
+    
     # Create the banner panel
     try:
-        banner_panel = Panel(
-            Text("\n".join(banner_content) + "\n" + info_text, style=banner_config['banner_style']),
+        return Panel(
+            Text(body + "\n" + info_text, style=banner_config['banner_style']),
             border_style=banner_config['border_style'],
             title=banner_config['title'],
             subtitle=banner_config['subtitle']
         )
-        
-        # Print the banner
-        console.print(banner_panel)
     except Exception as panel_err:
-        # Fallback to simple print if Rich panel fails
-        print("\n" + "=" * 80)
-        print(banner_config['title'].center(80))
-        print("=" * 80)
-        print("\n".join(banner_content))
-        print("\n" + info_text)
-        print("=" * 80)
-        print(banner_config['subtitle'].center(80))
-        print("=" * 80)
+        # Fallback to simple text if Rich panel fails
+        return "\n".join([
+            "\n" + "=" * 80,
+            banner_config['title'].center(80),
+            "=" * 80,
+            body,
+            "\n" + info_text,
+            "=" * 80,
+            banner_config['subtitle'].center(80),
+            "=" * 80
+        ])
+
+def show_banner(body: Optional[str] = None):
+    """Display a professional banner, filling in slow system information in place as it arrives"""
+    from concurrent.futures import wait, TimeoutError as FuturesTimeoutError
+    
+    banner_config = load_banner_config()
+    if body is None:
+        body = banner_cache.body(banner_config)
+    futures = system_info_provider.fetch(enabled_info_items(banner_config))
+    deadline = time.monotonic() + system_info_provider.timeout
+    
+    # Most items are ready almost at once; only draw placeholders for the slow ones
+    wait(list(futures.values()), timeout=0.05)
+    pending = [future for future in futures.values() if not future.done()]
+    banner = render_banner(banner_config, system_info_provider.values(futures), body)
+
+    def final_banner():
+        return render_banner(banner_config, system_info_provider.values(futures, expired=True), body)
+    
+    try:
+        if not pending:
+            console.print(banner)
+        elif isinstance(banner, str) or not console.is_terminal:
+            # No in-place updates possible: wait for the values (up to the timeout) and print once
+            wait(pending, timeout=max(deadline - time.monotonic(), 0))
+            console.print(final_banner())
+        else:
+            from rich.live import Live
+            
+            with Live(banner, console=console, auto_refresh=False) as live:
+                try:
+                    for _ in as_completed(pending, timeout=max(deadline - time.monotonic(), 0)):
+                        live.update(render_banner(banner_config, system_info_provider.values(futures), body),
+                                    refresh=True)
+                except FuturesTimeoutError:
+                    pass
+                live.update(final_banner(), refresh=True)
+    except Exception:
+        print(final_banner())
     
     # Add a blank line after banner
     try:
@@ -1013,10 +3122,11 @@ def customize_terminal():
     print("2. Change banner style")
     print("3. Change colors")
     print("4. Reset to default")
+    print("5. Change completion matching")
     print("0. Save and exit")
     
     while True:
-        choice = input("\nEnter your choice (0-4): ")
+        choice = input("\nEnter your choice (0-5): ")
         
         if choice == '1':
             customize_prompt_style()
@@ -1038,6 +3148,9 @@ def customize_terminal():
                     reset_configuration()
                 return  # Exit customization after reset
             
+        elif choice == '5':
+            customize_completion_mode()
+            
         elif choice == '0':
             # Show animation for saving
             try:
@@ -1238,6 +3351,7 @@ def preview_prompt(prompt_format, username="user", hostname="machine", directory
     preview = preview.replace("%hostname%", hostname)
     preview = preview.replace("%directory%", directory)
     preview = preview.replace("%time%", time_str)
+    preview = preview.replace("%last_duration%", "1.2s")
     preview = preview.replace("%branch%", "main")
     
     # Replace color tags with ANSI color codes
@@ -1492,18 +3606,12 @@ def customize_prompt_style():
         # Let user select from prompt library
         selected_format = select_prompt_from_library()
         if selected_format:
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_prompt_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except:
-                config = {}
+            config = config_manager.raw('prompt')
             
             config['format'] = selected_format
             
             try:
-                with open(config_file, 'w') as f:
-                    json.dump(config, f, indent=4)
+                config_manager.save('prompt', config)
                 print("\nPrompt style saved successfully!")
             except Exception as e:
                 print(f"\nError saving configuration: {e}")
@@ -1529,6 +3637,7 @@ def customize_prompt_style():
         print("%username% - Your username")
         print("%hostname% - Computer name")
         print("%directory% - Current directory")
+        print("%last_duration% - How long the last command took")
         
         print("\nExample format:")
         print("<purple>[<c>%time%<purple>]<c><n>[%username%]")
@@ -1539,10 +3648,8 @@ def customize_prompt_style():
         new_style = input("\nEnter your custom prompt style: ")
         if new_style:
             # Save configuration with the literal style tags (don't convert)
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_prompt_config.json')
             try:
-                with open(config_file, 'w') as f:
-                    json.dump({'format': new_style}, f, indent=4)
+                config_manager.save('prompt', {'format': new_style})
                 print("\nPrompt style saved successfully!")
             except Exception as e:
                 print(f"\nError saving configuration: {e}")
@@ -1571,16 +3678,10 @@ def customize_colors():
             new_color = input("Enter prompt color: ")
             
             # Save prompt color
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('style')
             
             config['prompt_color'] = new_color
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            config_manager.save('style', config)
             
             # Apply style changes immediately
             style_config = load_style_config()
@@ -1613,16 +3714,10 @@ def customize_colors():
             new_color = input("Enter input color: ")
             
             # Save input color
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('style')
             
             config['input_color'] = new_color
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            config_manager.save('style', config)
             
             # Apply style changes immediately
             style_config = load_style_config()
@@ -1655,16 +3750,10 @@ def customize_colors():
             new_color = input("Enter output color: ")
             
             # Save output color
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('style')
             
             config['output_color'] = new_color
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            config_manager.save('style', config)
             
             # Apply style changes immediately
             style_config = load_style_config()
@@ -1706,12 +3795,7 @@ def customize_colors():
                 new_color = input("Enter color: ")
                 
                 # Save completion menu color
-                config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-                try:
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
-                except Exception:
-                    config = {}
+                config = config_manager.raw('style')
                 
                 color_keys = {
                     '1': 'completion_bg',
@@ -1721,8 +3805,7 @@ def customize_colors():
                 }
                 
                 config[color_keys[subchoice]] = new_color
-                with open(config_file, 'w') as f:
-                    json.dump(config, f, indent=4)
+                config_manager.save('style', config)
                 print("\nColor saved successfully!")
             
         elif choice == '0':
@@ -1731,33 +3814,148 @@ def customize_colors():
         else:
             print("\nInvalid choice. Please try again.")
 
-def start_terminal():
-    """Start the main terminal"""
+def customize_completion_mode():
+    """Interactive function to choose how completions are matched"""
+    config = config_manager.raw('style')
+    
+    print("\n=== Completion Matching ===")
+    print(f"Current mode: {config.get('completion_mode', 'prefix')}")
+    print("1. Prefix - complete names that start with what you typed")
+    print("2. Fuzzy  - match characters in order anywhere in the name (like fzf),")
+    print("            ranked by match quality, including your command history")
+    print("0. Back")
+    
+    choice = input("\nEnter your choice (0-2): ")
+    modes = {'1': 'prefix', '2': 'fuzzy'}
+    if choice in modes:
+        config['completion_mode'] = modes[choice]
+        try:
+            config_manager.save('style', config)
+            print(f"\nCompletion mode set to {modes[choice]}!")
+        except Exception as e:
+            print(f"\nError saving configuration: {e}")
+
+class StartupProfiler:
+    """Per-phase startup timings, reported by --profile-startup"""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: List[Tuple[str, float]] = []
+        self._last = started
+        # In profiling mode the terminal stops right before showing the first prompt
+        self.stop_before_prompt = False
+
+    def mark(self, phase: str):
+        """Record the time spent since the previous mark under the given phase name"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def elapsed(self) -> float:
+        """Seconds from process start-up to the last mark"""
+        return self._last - self.started
+
+    def import_timings(self, limit: int = 15) -> List[Tuple[str, float, float]]:
+        """Import this module in a fresh interpreter with -X importtime; returns (module, self, cumulative)"""
+        module_dir = os.path.dirname(os.path.abspath(__file__))
+        module_name = os.path.splitext(os.path.basename(__file__))[0]
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+                                cwd=module_dir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, timeout=60)
+        timings = []
+        for line in result.stderr.splitlines():
+            # "import time:  self [us] | cumulative | imported package"; nested imports are
+            # indented and listed before the module that imported them
+            match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$', line)
+            if not match:
+                continue
+            depth = len(match.group(3))
+            if depth == 0:
+                if match.group(4) == module_name:
+                    break
+                # Imported by the interpreter's own startup, not by this module
+                timings = []
+            elif depth == 2:
+                timings.append((match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6))
+        timings.sort(key=lambda timing: timing[2], reverse=True)
+        return timings[:limit]
+
+    def report(self):
+        """Print import and phase timings"""
+        from rich.table import Table
+        
+        imports = Table(title="Slowest imports (fresh interpreter)", border_style="blue")
+        imports.add_column("Module", style="cyan")
+        imports.add_column("Self", justify="right")
+        imports.add_column("Cumulative", justify="right", style="yellow")
+        try:
+            for module, self_time, cumulative in self.import_timings():
+                imports.add_row(module, f"{self_time * 1000:.1f} ms", f"{cumulative * 1000:.1f} ms")
+        except Exception as e:
+            imports.add_row(f"[red]unavailable: {e}[/red]", "", "")
+
+        phases = Table(title="Startup phases", border_style="blue")
+        phases.add_column("Phase", style="cyan")
+        phases.add_column("Time", justify="right", style="yellow")
+        for phase, seconds in self.phases:
+            phases.add_row(phase, f"{seconds * 1000:.1f} ms")
+        phases.add_row("[bold]Total (to first prompt)[/bold]",
+                       f"[bold]{self.elapsed() * 1000:.1f} ms[/bold]")
+        console.print(imports)
+        console.print(phases)
+
+startup_profiler = StartupProfiler(STARTUP_STARTED)
+
+def start_terminal(startup: Optional[dict] = None):
+    """Start the main terminal, reusing what the startup tasks already loaded"""
     # Make style variable global so we can modify it
     global style
+    startup = startup or {}
     
     # Clear the screen
     os.system('cls' if platform.system() == 'Windows' else 'clear')
     
     # Show the banner
-    show_banner()
+    show_banner(startup.get('banner'))
+    startup_profiler.mark("Banner")
     
     # Create history file path
     history_file = os.path.join(os.path.expanduser('~'), '.terminal_history')
     
+    first_session = True
     restart = True
     while restart:
         restart = False
         
-        # Create session with current style
+        # Create session with current style (the first one uses the preloaded history)
+        history = startup.get('history') if first_session else None
+        history = history or FileHistory(history_file)
+        completer = ProfessionalCompleter(
+            match_mode=load_style_config()['completion_mode'],
+            history=history
+        )
         session = PromptSession(
-            history=FileHistory(history_file),
+            history=history,
             style=style,
-            completer=ProfessionalCompleter()
+            completer=completer,
+            complete_in_thread=True
         )
         
+        # Warm the help cache for the most used commands in the background
+        help_cache.prefetch(frecency_store.top('command', 20))
+        startup_profiler.mark("Prompt session setup")
+        if startup_profiler.stop_before_prompt:
+            startup_profiler.report()
+            return
+        if first_session:
+            first_session = False
+            console.print(f"[dim]Ready in {startup_profiler.elapsed():.2f}s[/dim]")
+        
         while True:
             try:
+                # Tell the user about background jobs that finished in the meantime
+                report_finished_jobs()
+                
                 # Get user input with custom prompt
                 command = session.prompt(get_prompt())
                 
@@ -1797,9 +3995,17 @@ def start_terminal():
                     restart = True
                     break
                 
+                # Handle stats command
+                if command.lower() == 'stats':
+                    show_command_stats()
+                    continue
+                
+                # Handle job control commands
+                if handle_job_command(command):
+                    continue
+                
                 # Handle help command
                 if command.lower().startswith('help '):
-                    completer = ProfessionalCompleter()
                     help_text = completer._get_command_help(command.split()[1])
                     if help_text:
                         console.print(Panel(help_text, title="Command Help", border_style="blue"))
@@ -1811,6 +4017,8 @@ def start_terminal():
                 if command.strip():
                     output = execute_command(command)
                     if output:
+                        from rich.syntax import Syntax
+                        
                         # Display command output in a panel
                         console.print(Panel(
                             Syntax(output, "bash", theme="monokai"),
@@ -1822,41 +4030,224 @@ def start_terminal():
             except EOFError:
                 return
 
+def run_benchmarks(iterations: int = 200):
+    """Time the terminal's hot paths and print the results"""
+    def timed(func, count):
+        started = time.perf_counter()
+        for _ in range(count):
+            func()
+        return (time.perf_counter() - started) / count
+    
+    results = []
+    if shell_coprocess is not None:
+        # Command spawn: a fresh shell per command vs. the warm coprocess
+        for command in ('true', 'echo hello'):
+            fresh = timed(lambda: subprocess.run(command, shell=True, stdout=subprocess.PIPE,
+                                                 stderr=subprocess.PIPE), iterations)
+            warm = timed(lambda: shell_coprocess.run(command, lambda stream, data: None), iterations)
+            results.append((f"Popen(shell=True): {command}", fresh))
+            results.append((f"Shell coprocess: {command}", warm))
+    
+    # Prompt rendering: compiling the configured format every time vs. the cached template
+    def compile_and_render():
+        prompt_config = load_prompt_config()
+        return PromptTemplate(prompt_config['format'], prompt_config['time_format']).render()
+    results.append(("Prompt: load config + compile", timed(compile_and_render, iterations * 10)))
+    results.append(("Prompt: cached template", timed(get_prompt, iterations * 10)))
+    
+    # Image to ASCII art conversion of a banner image at several widths
+    if importlib.util.find_spec('PIL') is not None:
+        from PIL import Image, ImageDraw
+        
+        image = Image.new('RGBA', (800, 600), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        for step in range(0, 300, 20):
+            draw.ellipse((100 + step, 50 + step // 2, 700 - step, 550 - step // 2), fill=(step, 255 - step, 128, 255))
+        for width in (40, 80, 160, 320):
+            results.append((f"Image to ASCII: width {width}", timed(lambda: convert_image_to_ascii(image, width),
+                                                                   max(iterations // 10, 1))))
+    
+    console.print(Panel(
+        "\n".join(f"{name:<40} {seconds * 1000:8.3f} ms" for name, seconds in results)
+        or "Nothing to benchmark on this platform",
+        title=f"Benchmarks ({iterations} iterations)",
+        border_style="blue"
+    ))
+
 def main():
     """Main entry point for the terminal application"""
+    startup_profiler.mark("Module import")
+    parser = argparse.ArgumentParser(description="Futuristic Terminal")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="measure command execution latency and exit")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="report import and startup phase timings instead of showing the prompt")
+    parser.add_argument('--fast-start', action='store_true',
+                        help="skip the loading screen and go straight to the prompt")
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        run_benchmarks()
+        return
+    startup_profiler.stop_before_prompt = args.profile_startup
+    setup_collation()
+
     # Check if configuration files exist, create with defaults if not
     try:
-        banner_config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-        prompt_config_file = os.path.join(os.path.expanduser('~'), '.terminal_prompt_config.json')
-        style_config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-        
-        if not os.path.exists(banner_config_file) or not os.path.exists(prompt_config_file) or not os.path.exists(style_config_file):
+        if not all(os.path.exists(config_manager.path(name)) for name in ('banner', 'prompt', 'style')):
             print("Creating default configuration files...")
             reset_configuration()
     except Exception as e:
         print(f"Error checking configuration files: {e}")
         print("Continuing with default settings...")
+    startup_profiler.mark("Configuration check")
     
-    # Try to show loading animation
+    # Initialize concurrently behind the loading screen (or silently with --fast-start)
+    startup = {}
     try:
-        show_loading_animation()
+        startup = run_startup_tasks(animate=not args.fast_start)
     except:
         print("Starting terminal...")
-    
+    startup_profiler.mark("Startup tasks")
+
     # Start the terminal with error handling
     try:
-        start_terminal()
+        start_terminal(startup)
     except Exception as e:
         print(f"Error starting terminal: {e}")
         print("Please report this error to the developer.")
         input("Press Enter to exit...")
         sys.exit(1)
 
-def load_banner_config():
-    """Load banner configuration from file or use defaults"""
-    config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-    default_config = {
-        'banner_text': """
+class ConfigManager:
+    """Configuration files loaded once and served from memory, reloaded only when a file changes on disk"""
+
+    def __init__(self, directory: Optional[str] = None, write_delay: float = 0.5):
+        self.directory = directory or os.path.expanduser('~')
+        # Saves are write-behind: files are written once no change came in for write_delay seconds
+        self.write_delay = write_delay
+        self._files: Dict[str, str] = {}
+        self._defaults: Dict[str, dict] = {}
+        # name -> (file signature, parsed contents, version)
+        self._entries: Dict[str, Tuple[Optional[Tuple[int, int]], dict, int]] = {}
+        # Saved configurations not yet written to disk
+        self._pending: Dict[str, dict] = {}
+        self._timer = None
+        self._lock = threading.RLock()
+        # Serializes the actual file writes (the timer thread and flush at exit)
+        self._write_lock = threading.Lock()
+        self.last_error: Optional[Exception] = None
+
+    def register(self, name: str, filename: str, defaults: dict):
+        """Declare a configuration file and its default values"""
+        self._files[name] = filename
+        self._defaults[name] = defaults
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, self._files[name])
+
+    def _signature(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path(name))
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read(path: str) -> Optional[dict]:
+        try:
+            with open(path, 'r') as f:
+                contents = json.load(f)
+            return contents if isinstance(contents, dict) else None
+        except Exception:
+            return None
+
+    def _entry(self, name: str) -> Tuple[Optional[Tuple[int, int]], dict, int]:
+        """The cached contents of a file, re-read if its mtime or size changed"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if name in self._pending:
+                # Not written yet: memory is ahead of the file
+                return entry
+            signature = self._signature(name)
+            if entry is not None and entry[0] == signature:
+                return entry
+            contents = {}
+            if signature is not None:
+                contents = self._read(self.path(name))
+                if contents is None:
+                    # A damaged file is replaced by the last good version, if there is one
+                    contents = self._read(self.path(name) + '.bak') or {}
+            entry = (signature, contents, entry[2] + 1 if entry else 1)
+            self._entries[name] = entry
+            return entry
+
+    def defaults(self, name: str) -> dict:
+        """A copy of the default values for a configuration"""
+        return copy.deepcopy(self._defaults[name])
+
+    def raw(self, name: str) -> dict:
+        """A copy of what the file itself contains (no defaults), for read-modify-save edits"""
+        return copy.deepcopy(self._entry(name)[1])
+
+    def get(self, name: str) -> dict:
+        """The configuration with the file's values merged over the defaults"""
+        config = self.defaults(name)
+        config.update(self.raw(name))
+        return config
+
+    def version(self, name: str) -> int:
+        """A number that changes whenever the configuration does"""
+        return self._entry(name)[2]
+
+    def save(self, name: str, config: dict):
+        """Change a configuration now; the file is written shortly after (see flush)"""
+        config = copy.deepcopy(config)
+        with self._lock:
+            entry = self._entries.get(name)
+            self._entries[name] = (entry[0] if entry else None, config, entry[2] + 1 if entry else 1)
+            self._pending[name] = config
+            # Restart the countdown so a burst of edits is written once
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> bool:
+        """Write all pending configurations to disk; returns False if any write failed"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending = list(self._pending.items())
+            ok = True
+            for name, config in pending:
+                try:
+                    write_json_atomic(self.path(name), config, indent=4, backup=True)
+                except Exception as e:
+                    # Stays pending, so the next flush (at the latest, at exit) tries again
+                    self.last_error = e
+                    ok = False
+                    continue
+                with self._lock:
+                    # Unless it was changed again meanwhile, the file now matches memory
+                    if self._pending.get(name) is config:
+                        del self._pending[name]
+                        entry = self._entries[name]
+                        self._entries[name] = (self._signature(name), entry[1], entry[2])
+            return ok
+
+    def flush_at_exit(self):
+        """Write pending changes before the terminal exits"""
+        if not self.flush():
+            print(f"Error saving configuration: {self.last_error}")
+
+config_manager = ConfigManager()
+atexit.register(config_manager.flush_at_exit)
+config_manager.register('banner', '.terminal_banner_config.json', {
+    'banner_text': """
     ███████╗██╗   ██╗████████╗██╗  ██╗███████╗██████╗ ██╗ ██████╗ 
     ██╔════╝██║   ██║╚══██╔══╝██║  ██║██╔════╝██╔══██╗██║██╔════╝ 
     █████╗  ██║   ██║   ██║   ███████║█████╗  ██████╔╝██║██║  ███╗
@@ -1864,151 +4255,68 @@ def load_banner_config():
     ██║     ╚██████╔╝   ██║   ██║  ██║███████╗██║  ██║██║╚██████╔╝
     ╚═╝      ╚═════╝    ╚═╝   ╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝ ╚═════╝ 
         """,
-        'banner_style': 'bold cyan',
-        'border_style': 'cyan',
-        'title': 'Professional Terminal',
-        'subtitle': 'Press TAB for smart completion',
-        'show_info': True,
-        'banner_font': 'Standard',  # Default font
-        'info_items': {
-            'OS': True,
-            'Shell': True,
-            'Python': True,
-            'Time': True,
-            'Directory': True,
-            'Username': True,
-            'Hostname': True,
-            'Memory': True,
-            'CPU': True
-        },
-        'custom_info': {
-            'Welcome': 'Welcome to your custom terminal!',
-            'Status': 'System Ready'
-        },
-        'banner_image': None,
-        'image_width': 40
-    }
-    
-    try:
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                user_config = json.load(f)
-                # Merge user config with defaults
-                default_config.update(user_config)
-    except Exception:
-        pass
-    
-    return default_config
+    'banner_style': 'bold cyan',
+    'border_style': 'cyan',
+    'title': 'Professional Terminal',
+    'subtitle': 'Press TAB for smart completion',
+    'show_info': True,
+    'banner_font': 'Standard',  # Default font
+    'info_items': {
+        'OS': True,
+        'Shell': True,
+        'Python': True,
+        'Time': True,
+        'Directory': True,
+        'Username': True,
+        'Hostname': True,
+        'Memory': True,
+        'CPU': True
+    },
+    'custom_info': {
+        'Welcome': 'Welcome to your custom terminal!',
+        'Status': 'System Ready'
+    },
+    'banner_image': None,
+    'image_width': 40
+})
+config_manager.register('prompt', '.terminal_prompt_config.json', {
+    'format': '<green>[%time% %username%]<c>',
+    'time_format': '%H:%M:%S'
+})
+config_manager.register('style', '.terminal_style_config.json', {
+    'prompt_color': '#00ff00',
+    'input_color': '#00ffff',
+    'output_color': '#ffffff',
+    'completion_bg': '#008888',
+    'completion_text': '#ffffff',
+    'completion_selected_bg': '#00aaaa',
+    'completion_selected_text': '#000000',
+    'completion_mode': 'prefix',
+    'fast_builtins': True
+})
+
+def load_banner_config():
+    """Load banner configuration from file or use defaults"""
+    config = config_manager.get('banner')
+    image = config.get('banner_image')
+    if image and not ImageStore.is_reference(image):
+        # Older configurations embed the image as base64
+        config['banner_image'] = migrate_banner_image(image) or image
+    return config
 
 def load_prompt_config():
     """Load prompt configuration from file or use defaults"""
-    config_file = os.path.join(os.path.expanduser('~'), '.terminal_prompt_config.json')
-    default_config = {
-        'format': '<green>[%time% %username%]<c>',
-        'time_format': '%H:%M:%S'
-    }
-    
-    try:
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                user_config = json.load(f)
-                # Merge user config with defaults
-                default_config.update(user_config)
-    except Exception:
-        pass
-    
-    return default_config
+    return config_manager.get('prompt')
 
 def load_style_config():
     """Load style configuration from file or use defaults"""
-    config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-    default_config = {
-        'prompt_color': '#00ff00',
-        'input_color': '#00ffff',
-        'output_color': '#ffffff',
-        'completion_bg': '#008888',
-        'completion_text': '#ffffff',
-        'completion_selected_bg': '#00aaaa',
-        'completion_selected_text': '#000000'
-    }
-    
-    try:
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                user_config = json.load(f)
-                # Merge user config with defaults
-                default_config.update(user_config)
-    except Exception:
-        pass
-    
-    return default_config
+    return config_manager.get('style')
 
 def reset_configuration():
     """Reset all configuration files to default values"""
     try:
-        # Reset banner configuration
-        banner_config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-        default_banner_config = {
-            'banner_text': """
-    ███████╗██╗   ██╗████████╗██╗  ██╗███████╗██████╗ ██╗ ██████╗ 
-    ██╔════╝██║   ██║╚══██╔══╝██║  ██║██╔════╝██╔══██╗██║██╔════╝ 
-    █████╗  ██║   ██║   ██║   ███████║█████╗  ██████╔╝██║██║  ███╗
-    ██╔══╝  ██║   ██║   ██║   ██╔══██║██╔══╝  ██╔══██╗██║██║   ██║
-    ██║     ╚██████╔╝   ██║   ██║  ██║███████╗██║  ██║██║╚██████╔╝
-    ╚═╝      ╚═════╝    ╚═╝   ╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝ ╚═════╝ 
-            """,
-            'banner_style': 'bold cyan',
-            'border_style': 'cyan',
-            'title': 'Professional Terminal',
-            'subtitle': 'Press TAB for smart completion',
-            'show_info': True,
-            'banner_font': 'Standard',  # Default font
-            'info_items': {
-                'OS': True,
-                'Shell': True,
-                'Python': True,
-                'Time': True,
-                'Directory': True,
-                'Username': True,
-                'Hostname': True,
-                'Memory': True,
-                'CPU': True
-            },
-            'custom_info': {
-                'Welcome': 'Welcome to your custom terminal!',
-                'Status': 'System Ready'
-            },
-            'banner_image': None,
-            'image_width': 40
-        }
-        
-        with open(banner_config_file, 'w') as f:
-            json.dump(default_banner_config, f, indent=4)
-        
-        # Reset prompt configuration
-        prompt_config_file = os.path.join(os.path.expanduser('~'), '.terminal_prompt_config.json')
-        default_prompt_config = {
-            'format': '<green>[%time% %username%]<c>',
-            'time_format': '%H:%M:%S'
-        }
-        
-        with open(prompt_config_file, 'w') as f:
-            json.dump(default_prompt_config, f, indent=4)
-        
-        # Reset style configuration
-        style_config_file = os.path.join(os.path.expanduser('~'), '.terminal_style_config.json')
-        default_style_config = {
-            'prompt_color': '#00ff00',
-            'input_color': '#00ffff',
-            'output_color': '#ffffff',
-            'completion_bg': '#008888',
-            'completion_text': '#ffffff',
-            'completion_selected_bg': '#00aaaa',
-            'completion_selected_text': '#000000'
-        }
-        
-        with open(style_config_file, 'w') as f:
-            json.dump(default_style_config, f, indent=4)
+        for name in ('banner', 'prompt', 'style'):
+            config_manager.save(name, config_manager.defaults(name))
         
         # Reset history file
         history_file = os.path.join(os.path.expanduser('~'), '.terminal_history')
@@ -2063,6 +4371,10 @@ def show_customization_animation():
 
 def customize_banner():
     """Interactive function to customize the terminal banner"""
+    if PYFIGLET_AVAILABLE:
+        global pyfiglet
+        import pyfiglet
+    
     print("\n=== Banner Customization ===")
     print("1. Change banner text")
     print("2. Change banner style")
@@ -2081,12 +4393,7 @@ def customize_banner():
             print("Example of ASCII art generator websites: patorjk.com/software/taag/")
             
             # Get current configuration
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('banner')
                 
             # Get current font if any
             current_font = config.get('banner_font', 'Standard')
@@ -2124,8 +4431,7 @@ def customize_banner():
                     # No pyfiglet, use plain text
                     config['banner_text'] = new_text
                 
-                with open(config_file, 'w') as f:
-                    json.dump(config, f, indent=4)
+                config_manager.save('banner', config)
                 print("\nBanner text saved successfully!")
             
         elif choice == '7':
@@ -2231,12 +4537,7 @@ def customize_banner():
                     print(f"{i}. {font}")
             
             # Get current config
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('banner')
             
             # Get current font
             current_font = config.get('banner_font', None)
@@ -2288,8 +4589,7 @@ def customize_banner():
                         print(f"\nError previewing font: {e}")
                     
                     # Save configuration
-                    with open(config_file, 'w') as f:
-                        json.dump(config, f, indent=4)
+                    config_manager.save('banner', config)
                     
                     print(f"\nFont '{selected_font}' selected and saved!")
                 else:
@@ -2307,20 +4607,14 @@ def customize_banner():
             border_style = input("Enter border style: ")
             
             # Save style settings
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('banner')
             
             if banner_style:
                 config['banner_style'] = banner_style
             if border_style:
                 config['border_style'] = border_style
                 
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            config_manager.save('banner', config)
             print("\nBanner style saved successfully!")
             
         elif choice == '3':
@@ -2328,20 +4622,14 @@ def customize_banner():
             subtitle = input("Enter banner subtitle: ")
             
             # Save title and subtitle
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('banner')
             
             if title:
                 config['title'] = title
             if subtitle:
                 config['subtitle'] = subtitle
                 
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            config_manager.save('banner', config)
             print("\nBanner title and subtitle saved successfully!")
             
         elif choice == '4':
@@ -2349,12 +4637,7 @@ def customize_banner():
             print("Select which system information to show in the banner:")
             
             # Get current configuration
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('banner')
             
             if 'info_items' not in config:
                 config['info_items'] = {}
@@ -2398,20 +4681,14 @@ def customize_banner():
             show_info = input("\nShow system information in banner? (y/n): ").lower() == 'y'
             config['show_info'] = show_info
             
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            config_manager.save('banner', config)
             print("\nSystem information settings saved!")
             
         elif choice == '5':
             print("\n=== Custom Information Configuration ===")
             
             # Get current configuration
-            config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
+            config = config_manager.raw('banner')
             
             if 'custom_info' not in config:
                 config['custom_info'] = {}
@@ -2439,8 +4716,7 @@ def customize_banner():
                     custom_info[key] = value
                     config['custom_info'] = custom_info
                     
-                    with open(config_file, 'w') as f:
-                        json.dump(config, f, indent=4)
+                    config_manager.save('banner', config)
                     print(f"\nCustom info '{key}' added successfully!")
                     
             elif subchoice == '2':
@@ -2450,8 +4726,7 @@ def customize_banner():
                         del custom_info[remove_key]
                         config['custom_info'] = custom_info
                         
-                        with open(config_file, 'w') as f:
-                            json.dump(config, f, indent=4)
+                        config_manager.save('banner', config)
                         print(f"\nCustom info '{remove_key}' removed successfully!")
                     else:
                         print(f"\nCustom info '{remove_key}' not found")
@@ -2467,9 +4742,10 @@ def customize_banner():
             
             if image_path and os.path.exists(image_path):
                 try:
-                    # Open and encode the image
-                    with open(image_path, 'rb') as img_file:
-                        image_data = base64.b64encode(img_file.read()).decode('utf-8')
+                    from PIL import Image
+                    
+                    # Copy the image into the image store
+                    image_reference = image_store.put_file(image_path)
                     
                     # Ask for image width
                     try:
@@ -2478,19 +4754,13 @@ def customize_banner():
                     except ValueError:
                         width = 40
                     
-                    # Save the image data
-                    config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-                    try:
-                        with open(config_file, 'r') as f:
-                            config = json.load(f)
-                    except Exception:
-                        config = {}
+                    # Save the image reference
+                    config = config_manager.raw('banner')
                     
-                    config['banner_image'] = image_data
+                    config['banner_image'] = image_reference
                     config['image_width'] = width
                     
-                    with open(config_file, 'w') as f:
-                        json.dump(config, f, indent=4)
+                    config_manager.save('banner', config)
                     print("\nBanner image saved successfully!")
                     
                     # Preview the image
@@ -2511,17 +4781,11 @@ def customize_banner():
             if not image_path:
                 remove = input("\nRemove current banner image? (y/n): ").lower() == 'y'
                 if remove:
-                    config_file = os.path.join(os.path.expanduser('~'), '.terminal_banner_config.json')
-                    try:
-                        with open(config_file, 'r') as f:
-                            config = json.load(f)
-                    except Exception:
-                        config = {}
+                    config = config_manager.raw('banner')
                     
                     config['banner_image'] = None
                     
-                    with open(config_file, 'w') as f:
-                        json.dump(config, f, indent=4)
+                    config_manager.save('banner', config)
                     print("\nBanner image removed!")
                     
         elif choice == '0':